@@ -0,0 +1,55 @@
+# Library entry point for the scripts: each name is imported from its
+# module on first use, so importing api stays cheap.
+#
+#   determinize(automaton)  determinizar.Automaton -> determinizar.Automaton
+#   minimize(afd)           minimizar.AFD -> minimizar.AFD
+#   regex_to_dfa(regex)     str -> regex_to_dfa.ConvertToDfa
+#   first_follow(grammar)   {nonterminal: [productions]} -> (first, follow)
+#   ll1_table(grammar)      str -> ll1.GrammarParser
+#   ll1_parser(grammar)     str -> ll1.PredictiveParser
+#   equivalent(a, b)        any two DFAs -> bool
+#   difference(a, b)        any two DFAs -> shortest distinguishing word or None
+#   intersection(a, b)      any two DFAs -> lazy product DFA (also union, minus)
+#   witness(dfa)            any DFA -> shortest accepted word or None
+#   materialize(dfa)        any DFA -> minimizar.AFD of its reachable part
+import importlib
+
+EXPORTS = {
+    'determinize': 'determinizar',
+    'parse_automaton': ('determinizar', 'parse'),
+    'minimize': 'minimizar',
+    'parse_afd': ('minimizar', 'parse'),
+    'regex_to_dfa': 'regex_to_dfa',
+    'compile': 'dfa_matcher',
+    'first_follow': 'first_follow',
+    'parse_productions': ('first_follow', 'parse_input'),
+    'll1_table': 'll1',
+    'll1_parser': 'll1',
+    'equivalent': 'dfa_equivalence',
+    'difference': 'dfa_equivalence',
+    'included': 'dfa_equivalence',
+    'inclusion_counterexample': 'dfa_equivalence',
+    'intersection': 'product',
+    'union': 'product',
+    'minus': 'product',
+    'complement': 'product',
+    'witness': 'product',
+    'is_empty': 'product',
+    'is_universal': 'product',
+    'materialize': 'product',
+}
+
+__all__ = list(EXPORTS)
+
+
+def __getattr__(name):
+    if name not in EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attribute = EXPORTS[name] if isinstance(EXPORTS[name], tuple) else (EXPORTS[name], name)
+    value = getattr(importlib.import_module(module), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(EXPORTS))
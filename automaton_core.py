@@ -0,0 +1,183 @@
+from array import array
+from collections import Counter
+from itertools import accumulate, chain, repeat
+from operator import add, mul
+
+EPSILON = '&'
+
+
+def csr_offsets(size, keys):
+    # offsets[k] is the number of keys below k (0 <= key < size). The only
+    # Python loop is over the distinct keys; the rest runs in C level
+    # iterators, so a sparse key space costs little more than its size in
+    # bytes.
+    counts = array('i', bytes(4 * (size + 1)))
+    for key, count in Counter(keys).items():
+        counts[key + 1] = count
+    return array('i', accumulate(counts))
+
+
+def build_csr(size, keys, values):
+    # Groups values by key (0 <= key < size): the values of key k, in input
+    # order, are targets[offsets[k]:offsets[k + 1]]
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    return csr_offsets(size, keys), array('i', map(values.__getitem__, order))
+
+
+def unbrace(field):
+    # A {...} list field without its outer braces; only one pair is removed,
+    # as state names may be braced too ({{A},{AB}})
+    field = field.strip()
+    if field.startswith('{') and field.endswith('}'):
+        field = field[1:-1]
+    return field
+
+
+class Automaton:
+    # Finite automaton with states and symbols interned to ints: ids index
+    # the states and symbols name lists, final[state] is 1 for final states.
+    # Transitions are in CSR form, one cell per (state, symbol) pair: the
+    # targets of state s on symbol a are targets[offsets[c]:offsets[c + 1]]
+    # with c = s * len(symbols) + a. tails and labels give the source and
+    # symbol of every entry of targets, so the transitions can also be
+    # walked without visiting every cell; offsets, which has one entry per
+    # cell, is only built when first used. alphabet lists the symbols the
+    # input declared, which may differ from the ones transitions use.
+    __slots__ = ('states', 'symbols', 'alphabet', 'initial', 'final', '_offsets', 'targets', 'tails', 'labels',
+                 'declared_states')
+
+    def __init__(self, states, symbols, initial, final, sources, labels, destinations, alphabet=None,
+                 declared_states=None):
+        self.states = states
+        self.symbols = symbols
+        self.alphabet = list(symbols) if alphabet is None else alphabet
+        self.initial = initial
+        self.final = final
+        self.declared_states = len(states) if declared_states is None else declared_states
+
+        width = len(symbols)
+        keys = array('q', map(add, map(mul, sources, repeat(width)), labels))
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.targets = array('i', map(destinations.__getitem__, order))
+        self.tails = array('i', map(sources.__getitem__, order))
+        self.labels = array('i', map(labels.__getitem__, order))
+        self._offsets = None
+
+    @classmethod
+    def read(cls, text):
+        # Reads n;initial;{finals};{alphabet};src,symbol,dst;... The initial
+        # and final states get the first ids, the other states are numbered
+        # in order of appearance.
+        parts = text.split(';')
+        declared_states = int(parts[0])
+        initial_name = parts[1].strip()
+        final_names = [name for name in map(str.strip, unbrace(parts[2]).split(',')) if name]
+        alphabet = [name for name in map(str.strip, unbrace(parts[3]).split(',')) if name]
+
+        # All transitions are split at once into a flat src, symbol, dst,
+        # src, ... list, then interned with dicts built from it
+        transitions = list(filter(None, map(str.strip, parts[4:])))
+        if not all(map((2).__eq__, map(str.count, transitions, repeat(',')))):
+            bad = next(part for part in transitions if part.count(',') != 2)
+            raise ValueError(f"Invalid transition: {bad!r}")
+        fields = list(map(str.strip, ','.join(transitions).split(','))) if transitions else []
+        names = fields[:]
+        del names[1::3]
+
+        state_ids = {name: i for i, name in enumerate(dict.fromkeys(chain((initial_name,), final_names, names)))}
+        symbol_ids = {name: i for i, name in enumerate(dict.fromkeys(chain(alphabet, fields[1::3])))}
+        sources = array('i', map(state_ids.__getitem__, fields[0::3]))
+        labels = array('i', map(symbol_ids.__getitem__, fields[1::3]))
+        destinations = array('i', map(state_ids.__getitem__, fields[2::3]))
+
+        final = bytearray(len(state_ids))
+        for name in final_names:
+            final[state_ids[name]] = 1
+        return cls(list(state_ids), list(symbol_ids), 0, final, sources, labels, destinations, alphabet,
+                   declared_states)
+
+    @property
+    def num_states(self):
+        return len(self.states)
+
+    @property
+    def offsets(self):
+        if self._offsets is None:
+            self._offsets = csr_offsets(len(self.states) * len(self.symbols), self.cells())
+        return self._offsets
+
+    def state_offsets(self):
+        # The entries of state s are targets[offsets[s]:offsets[s + 1]], as
+        # targets is sorted by source
+        return csr_offsets(len(self.states), self.tails)
+
+    def symbol_id(self, name):
+        return self.symbols.index(name) if name in self.symbols else -1
+
+    def successors(self, state, symbol):
+        cell = state * len(self.symbols) + symbol
+        return self.targets[self.offsets[cell]:self.offsets[cell + 1]]
+
+    def transitions(self):
+        # (source, symbol, destination) ids, grouped by source and symbol
+        return zip(self.tails, self.labels, self.targets)
+
+    def cells(self):
+        # The cell (source * len(symbols) + symbol) of every entry of targets
+        return array('i', map(add, map(mul, self.tails, repeat(len(self.symbols))), self.labels))
+
+    def reverse(self):
+        # offsets and targets of the reversed transitions, in the same layout
+        width = len(self.symbols)
+        keys = array('i', map(add, map(mul, self.targets, repeat(width)), self.labels))
+        return build_csr(len(self.states) * width, keys, self.tails)
+
+    def is_deterministic(self):
+        # Exactly one transition for every state and declared symbol, and no
+        # epsilon transitions
+        width = len(self.symbols)
+        offsets = self.offsets
+        declared = [self.symbol_id(name) for name in self.alphabet if name != EPSILON]
+        epsilon = self.symbol_id(EPSILON)
+        for state in range(len(self.states)):
+            if epsilon >= 0 and offsets[state * width + epsilon] != offsets[state * width + epsilon + 1]:
+                return False
+            for symbol in declared:
+                cell = state * width + symbol
+                if offsets[cell + 1] - offsets[cell] != 1:
+                    return False
+        return True
+
+    def format(self, braces=False, terminated=False):
+        # n;initial;{finals};{alphabet};src,symbol,dst... with the finals,
+        # alphabet and transitions sorted by name. braces writes every state
+        # name inside {} and terminated ends every transition with ';'.
+        states = self.states
+        symbols = self.symbols
+        names = ['{' + name + '}' for name in states] if braces else states
+        width = len(symbols)
+        offsets = self.offsets
+        targets = self.targets
+        by_name = states.__getitem__
+
+        transitions = []
+        symbol_order = sorted(range(width), key=symbols.__getitem__)
+        for source in sorted(range(len(states)), key=by_name):
+            for symbol in symbol_order:
+                cell = source * width + symbol
+                start, end = offsets[cell], offsets[cell + 1]
+                if start == end:
+                    continue
+                prefix = names[source] + ',' + symbols[symbol] + ','
+                for destination in sorted(targets[start:end], key=by_name):
+                    transitions.append(prefix + names[destination])
+
+        header = ';'.join((
+            str(len(states)),
+            names[self.initial],
+            '{' + ','.join(sorted(names[state] for state in range(len(states)) if self.final[state])) + '}',
+            '{' + ','.join(sorted(self.alphabet)) + '}',
+        ))
+        if terminated:
+            return header + ';' + ''.join(transition + ';' for transition in transitions)
+        return header + ';' + ';'.join(transitions)
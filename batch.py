@@ -0,0 +1,122 @@
+import argparse
+import importlib
+import json
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+TOOLS = ('determinizar', 'minimizar', 'regex_to_dfa', 'first_follow')
+
+
+def solve_all(tool, lines):
+    # Runs tool.solve on every line; a failing line gives (False, message)
+    # instead of stopping the others.
+    solve = importlib.import_module(tool).solve
+    results = []
+    for line in lines:
+        try:
+            results.append((True, solve(line)))
+        except Exception as error:
+            results.append((False, f"{type(error).__name__}: {error}"))
+    return results
+
+
+def read_records(file, jsonl=False):
+    # Yields (id, line, error) for each input line. Plain lines are
+    # identified by their line number; a blank one gives a None line, so
+    # that its output line can be left blank. JSONL records are identified
+    # by their "id" field and carry the tool input in "input"; blank lines
+    # between them are skipped.
+    for number, line in enumerate(file, 1):
+        line = line.rstrip('\r\n')
+        if not jsonl:
+            yield number, line if line.strip() else None, None
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            yield record.get('id', number), str(record['input']), None
+        except (ValueError, KeyError, AttributeError) as error:
+            yield number, None, f"Invalid record: {type(error).__name__}: {error}"
+
+
+def inputs(chunk):
+    return [line for _, line, error in chunk if error is None and line is not None]
+
+
+def merge(chunk, results):
+    results = iter(results)
+    for id_, line, error in chunk:
+        if error is not None:
+            yield id_, False, error
+        elif line is None:
+            yield id_, True, ''
+        else:
+            yield (id_, *next(results))
+
+
+def process(tool, records, workers=0, chunk_size=64, max_in_flight=None):
+    # Yields (id, ok, output or error message) in input order. With workers,
+    # chunks of records are solved in a process pool, keeping at most
+    # max_in_flight chunks submitted but not yet written out.
+    if tool not in TOOLS:
+        raise ValueError(f"Unknown tool: {tool}")
+
+    records = iter(records)
+    chunks = iter(lambda: list(islice(records, chunk_size)), [])
+    if not workers:
+        for chunk in chunks:
+            yield from merge(chunk, solve_all(tool, inputs(chunk)))
+        return
+
+    if max_in_flight is None:
+        max_in_flight = 2 * workers
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            if len(pending) >= max_in_flight:
+                done, future = pending.popleft()
+                yield from merge(done, future.result())
+            pending.append((chunk, pool.submit(solve_all, tool, inputs(chunk))))
+        while pending:
+            done, future = pending.popleft()
+            yield from merge(done, future.result())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs one of the tools on many inputs, one per line.")
+    parser.add_argument('tool', choices=TOOLS)
+    parser.add_argument('file', nargs='?', help="input file (default: stdin)")
+    parser.add_argument('--jsonl', action='store_true', help='records are {"id": ..., "input": ...} objects')
+    parser.add_argument('--workers', type=int, default=0, help="size of the process pool (default: no pool)")
+    parser.add_argument('--chunk-size', type=int, default=64)
+    parser.add_argument('--max-in-flight', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    file = open(args.file, encoding='utf-8') if args.file else sys.stdin
+    failed = 0
+    try:
+        results = process(args.tool, read_records(file, args.jsonl), args.workers, args.chunk_size,
+                          args.max_in_flight)
+        for id_, ok, value in results:
+            if not ok:
+                failed += 1
+            if args.jsonl:
+                record = {'id': id_, 'output': value} if ok else {'id': id_, 'error': value}
+                print(json.dumps(record, ensure_ascii=False))
+            elif ok:
+                print(value)
+            else:
+                # Keep one output line per input line
+                print()
+                print(f"{id_}: {value}", file=sys.stderr)
+    finally:
+        if file is not sys.stdin:
+            file.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
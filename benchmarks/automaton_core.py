@@ -0,0 +1,63 @@
+# Time and memory of the shared automaton core on a random DFA given as
+# text, 10^6 transitions by default:
+#   python -m benchmarks.automaton_core [--states 100000] [--symbols 10] [--no-memory]
+import argparse
+import random
+import tracemalloc
+
+from automaton_core import Automaton
+from benchmarks.common import timed
+from minimizar import AFD
+
+
+def random_dfa(states, symbols, seed=0):
+    rng = random.Random(seed)
+    names = [f'q{i}' for i in range(states)]
+    alphabet = [f's{i}' for i in range(symbols)]
+    finals = [name for name in names if rng.random() < 0.3]
+    transitions = [f'{name},{symbol},{names[rng.randrange(states)]}' for name in names for symbol in alphabet]
+    return ';'.join([str(states), names[0], '{' + ','.join(finals) + '}', '{' + ','.join(alphabet) + '}'] + transitions)
+
+
+def measured(memory, function, *args):
+    # (result, seconds, peak MB allocated during the call, MB still held)
+    if not memory:
+        return (*timed(function, *args), None, None)
+    tracemalloc.start()
+    result, seconds = timed(function, *args)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 2**20, held / 2**20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times the automaton core on a large random DFA.")
+    parser.add_argument('--states', type=int, default=100000)
+    parser.add_argument('--symbols', type=int, default=10)
+    parser.add_argument('--no-memory', action='store_true', help="skip tracemalloc, which slows the calls down")
+    args = parser.parse_args(argv)
+    memory = not args.no_memory
+
+    text = random_dfa(args.states, args.symbols)
+    print(f"{args.states} states, {args.symbols} symbols, {args.states * args.symbols} transitions, "
+          f"{len(text) / 2**20:.1f} MB of text")
+
+    steps = [
+        ('read', Automaton.read, text),
+        ('format', lambda automaton: automaton.format(), None),
+        ('reverse', lambda automaton: automaton.reverse(), None),
+        ('read+trim', lambda automaton: AFD.read(text).trim(), None),
+    ]
+    automaton = None
+    for label, function, argument in steps:
+        result, seconds, peak, held = measured(memory, function, argument if argument is not None else automaton)
+        if label == 'read':
+            automaton = result
+        line = f"  {label:9} {seconds:7.2f}s"
+        if memory:
+            line += f"  peak {peak:7.1f} MB  held {held:7.1f} MB"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+# Helpers for the benchmark scripts, which run from the repository root as
+# python -m benchmarks.<name> [options]
+import time
+
+
+def timed(function, *args, **kwargs):
+    # (result, seconds) of one call
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def rate(count, seconds):
+    # count per second, in millions
+    return count / seconds / 1e6 if seconds else float('inf')
@@ -0,0 +1,48 @@
+# FIRST and FOLLOW on generated grammars with hundreds or thousands of
+# nonterminals (uppercase letters beyond ASCII, one symbol each):
+#   python -m benchmarks.first_follow [--sizes 100 300 1000 1900] [--shape chain recursive]
+import argparse
+import string
+
+from benchmarks.common import timed
+from first_follow import first_sets, follow_sets, format_first_follow, nullable_set, parse_input
+
+NONTERMINALS = [chr(code) for code in range(0x41, 0x110000) if chr(code).isupper()]
+TERMINALS = string.ascii_lowercase
+
+
+def grammar(n, recursive):
+    # A chain A_i = A_{i+1} A_{i+1} t_i | & ending in z, so every FIRST and
+    # FOLLOW set grows along it; recursive adds left-recursive productions
+    # that also jump back and forth in the chain
+    names = NONTERMINALS[:n]
+    rules = [f"{names[i]} = {names[i + 1]}{names[i + 1]}{TERMINALS[i % 26]}" for i in range(n - 1)]
+    rules += [f"{name} = &" for name in names] + [f"{names[-1]} = z"]
+    if recursive:
+        rules += [f"{names[i]} = {names[i]}{TERMINALS[(i + 3) % 26]}{names[i * 7 % n]}" for i in range(0, n, 3)]
+    return '; '.join(rules)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times FIRST and FOLLOW on grammars with many nonterminals.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300, 1000, 1900])
+    parser.add_argument('--shape', nargs='+', choices=('chain', 'recursive'), default=['chain', 'recursive'])
+    args = parser.parse_args(argv)
+    if max(args.sizes) > len(NONTERMINALS):
+        parser.error(f"at most {len(NONTERMINALS)} nonterminals")
+
+    for shape in args.shape:
+        print(shape)
+        for n in args.sizes:
+            productions = parse_input(grammar(n, shape == 'recursive'))
+            nullable, nullable_seconds = timed(nullable_set, productions)
+            first, first_seconds = timed(first_sets, productions, nullable)
+            follow, follow_seconds = timed(follow_sets, productions, next(iter(productions)), first, nullable)
+            _, format_seconds = timed(format_first_follow, first, follow)
+            rules = sum(map(len, productions.values()))
+            print(f"  n={n:5}  rules={rules:5}  nullable {nullable_seconds:6.3f}s  first {first_seconds:6.3f}s"
+                  f"  follow {follow_seconds:6.3f}s  format {format_seconds:6.3f}s")
+
+
+if __name__ == '__main__':
+    main()
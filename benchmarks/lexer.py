@@ -0,0 +1,72 @@
+# Tokenizing a large generated source file with one combined Lexer DFA
+# against trying every rule's own CompiledDfa at each position:
+#   python -m benchmarks.lexer [--tokens 200000]
+import argparse
+import random
+
+from benchmarks.common import rate, timed
+from dfa_matcher import compile
+from lexer import Lexer
+
+RULES = [
+    ('if', 'if'),
+    ('else', 'else'),
+    ('while', 'while'),
+    ('return', 'return'),
+    ('name', '[a-zA-Z_][a-zA-Z_0-9]*'),
+    ('number', '[0-9]+(\\.[0-9]+)?'),
+    ('string', '"[a-z ]*"'),
+    ('op', '\\+|-|\\*|/|==|=|<|>'),
+    ('paren', '\\(|\\)|{|}'),
+    ('semicolon', ';'),
+    ('comma', ','),
+    (None, '[ \\n]+'),
+]
+SAMPLES = ['if', 'else', 'while', 'return', 'count', 'x1', '_tmp', '42', '3.14', '"hello world"', '+', '==',
+           '=', '<', '(', ')', '{', '}', ';', ',']
+
+
+def source(tokens, seed=0):
+    rng = random.Random(seed)
+    return ''.join(rng.choice(SAMPLES) + rng.choice(' \n ') for _ in range(tokens))
+
+
+def tokenize_each(patterns, text):
+    # Longest match over the rules one at a time, earliest rule on ties
+    tokens = []
+    pos = 0
+    classes = [(name, pattern, pattern.symbol_classes(text)) for name, pattern in patterns]
+    while pos < len(text):
+        best_end = pos
+        best_name = None
+        for name, pattern, symbols in classes:
+            end = pattern.longest(symbols, pos)
+            if end is not None and end > best_end:
+                best_end, best_name = end, name
+        if best_end == pos:
+            raise ValueError(f"No token matches at position {pos}")
+        if best_name is not None:
+            tokens.append((best_name, text[pos:best_end]))
+        pos = best_end
+    return tokens
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compares the combined Lexer DFA with one DFA per rule.")
+    parser.add_argument('--tokens', type=int, default=200000, help="size of the generated source")
+    args = parser.parse_args(argv)
+
+    lexer, seconds = timed(Lexer, RULES)
+    print(f"build Lexer ({len(RULES)} rules, {lexer.dfa.num_states} states): {seconds:.3f}s")
+    text = source(args.tokens)
+    print(f"source: {len(text) / 1e3:.0f} KB, {args.tokens} tokens")
+    combined, seconds = timed(lambda: [(token.type, token.value) for token in lexer.tokenize(text)])
+    print(f"  combined DFA     {seconds:7.3f}s  {rate(len(text), seconds):5.2f}M chars/s")
+    patterns = [(name, compile(regex)) for name, regex in RULES]
+    each, seconds = timed(tokenize_each, patterns, text)
+    print(f"  one DFA per rule {seconds:7.3f}s  {rate(len(text), seconds):5.2f}M chars/s")
+    assert combined == each
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# Table-driven LL(1) parsing of a multi-megabyte generated expression,
+# one character per token, as a bare derivation and as a parse tree built
+# with and without the garbage collector paused:
+#   python -m benchmarks.ll1_parser [--tokens 4000000]
+import argparse
+import random
+
+from benchmarks.common import rate, timed
+from ll1 import ll1_parser
+
+EXPRESSIONS = 'E = TX; X = +TX; X = &; T = FY; Y = *FY; Y = &; F = (E); F = i'
+
+
+def expression(tokens, seed=0):
+    # Expression of about that many tokens over i, +, * and parentheses,
+    # nested at most four levels deep
+    rng = random.Random(seed)
+    parts = []
+    depth = 0
+    while len(parts) < tokens:
+        if depth < 4 and rng.random() < 0.2:
+            parts.append('(')
+            depth += 1
+        parts.append('i')
+        while depth and rng.random() < 0.3:
+            parts.append(')')
+            depth -= 1
+        parts.append(rng.choice('+*'))
+    parts.pop()
+    parts.extend(')' * depth)
+    return ''.join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times LL(1) derivation and parse trees on a long expression.")
+    parser.add_argument('--tokens', type=int, default=4000000)
+    args = parser.parse_args(argv)
+
+    text = expression(args.tokens)
+    predictive = ll1_parser(EXPRESSIONS)
+    print(f"{len(text)} tokens ({len(text) / 1e6:.1f} MB)")
+
+    rules, seconds = timed(lambda: sum(1 for _ in predictive.derive(text)))
+    print(f"  derive                {seconds:7.2f}s  {rate(len(text), seconds):6.2f} M tokens/s  ({rules} rules)")
+    for pause_gc in (False, True):
+        tree, seconds = timed(predictive.parse, text, pause_gc=pause_gc)
+        label = 'parse, gc paused' if pause_gc else 'parse'
+        print(f"  {label:20}  {seconds:7.2f}s  {rate(len(text), seconds):6.2f} M tokens/s")
+        del tree
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# CompiledDfa against walking the State.Dtran dicts of ConvertToDfa on the
+# same DFA, over random text:
+#   python -m benchmarks.matcher [--size 1000000] [--regex '(a|b)*a(a|b)(a|b)(a|b)']
+import argparse
+import random
+
+from benchmarks.common import rate, timed
+from dfa_matcher import CompiledDfa
+from regex_to_dfa import ConvertToDfa, SyntaxTree
+
+
+def dtran_fullmatch(converter, text):
+    class_of = converter.tree.class_of
+    state = converter.initial_state
+    for symbol in text:
+        state = state.Dtran.get(class_of.get(symbol, 0))
+        if state is None:
+            return False
+    return converter.final_number in state.statenumber
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compares CompiledDfa with walking State.Dtran.")
+    parser.add_argument('--size', type=int, default=1000000)
+    parser.add_argument('--regex', default='(a|b)*a(a|b)(a|b)(a|b)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    converter = ConvertToDfa(tree=SyntaxTree(args.regex))
+    converter.convert()
+    pattern = CompiledDfa.from_converter(converter)
+    rng = random.Random(args.seed)
+    text = ''.join(rng.choice('ab') for _ in range(args.size))
+    data = text.encode()
+
+    print(f"{args.regex!r}, {args.size} symbols, {pattern.num_states} states")
+    for label, function, argument in [
+        ('Dtran walk fullmatch', lambda t: dtran_fullmatch(converter, t), text),
+        ('CompiledDfa.fullmatch str', pattern.fullmatch, text),
+        ('CompiledDfa.fullmatch bytes', pattern.fullmatch, data),
+        ('CompiledDfa.search str', pattern.search, text),
+    ]:
+        result, seconds = timed(function, argument)
+        print(f"  {label:28} {seconds:7.3f}s  {rate(args.size, seconds):6.2f}M symbols/s  -> {result}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+# Scaling of minimization on random complete DFAs, built directly as
+# arrays (no text parsing):
+#   python -m benchmarks.minimization [--sizes 1000 10000 100000 1000000] [--symbols 2] [--method hopcroft valmari]
+import argparse
+import random
+from array import array
+
+from benchmarks.common import timed
+from minimizar import AFD, HOPCROFT, VALMARI
+
+
+def random_dfa(states, symbols, seed=0):
+    rng = random.Random(seed)
+    sources = array('i', (state for state in range(states) for _ in range(symbols)))
+    labels = array('i', list(range(symbols)) * states)
+    destinations = array('i', (rng.randrange(states) for _ in range(states * symbols)))
+    final = bytearray(rng.random() < 0.5 for _ in range(states))
+    return AFD([f'q{i}' for i in range(states)], [f's{i}' for i in range(symbols)], 0, final,
+               sources, labels, destinations)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times minimization on random DFAs of growing size.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--symbols', type=int, default=2)
+    parser.add_argument('--method', nargs='+', choices=(HOPCROFT, VALMARI), default=[HOPCROFT, VALMARI])
+    args = parser.parse_args(argv)
+
+    for n in args.sizes:
+        dfa, seconds = timed(random_dfa, n, args.symbols)
+        line = f"  n={n:8}  build {seconds:6.2f}s"
+        for method in args.method:
+            minimal, seconds = timed(dfa.minimize, method)
+            line += f"  {method} {seconds:7.2f}s ({minimal.num_states} states)"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
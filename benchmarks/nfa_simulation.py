@@ -0,0 +1,63 @@
+# Bitmask NFA simulation (Automaton.accepts_many) against determinizing
+# first and running the DFA, on the "n-th symbol from the end is a" family,
+# whose DFA has 2^n states:
+#   python -m benchmarks.nfa_simulation [--sizes 8 12 16 20] [--words 1000] [--length 100]
+import argparse
+import random
+
+from benchmarks.common import timed
+from determinizar import parse
+from dfa_equivalence import view
+
+DETERMINIZE_LIMIT = 16
+
+
+def nth_from_end(n):
+    transitions = ['q0,a,q0', 'q0,b,q0', 'q0,a,q1']
+    transitions += [f'q{i},{symbol},q{i + 1}' for i in range(1, n) for symbol in 'ab']
+    return ';'.join([str(n + 1), 'q0', f'{{q{n}}}', '{a,b}'] + transitions)
+
+
+def run_dfa(dfa, words):
+    dfa = view(dfa)
+    results = []
+    for word in words:
+        state = dfa.initial
+        for symbol in word:
+            state = dfa.step(state, symbol)
+            if state is None:
+                break
+        results.append(state is not None and bool(dfa.is_final(state)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compares NFA simulation with determinize-then-run.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[8, 12, 16, 20])
+    parser.add_argument('--words', type=int, default=1000)
+    parser.add_argument('--length', type=int, default=100)
+    parser.add_argument('--determinize-limit', type=int, default=DETERMINIZE_LIMIT,
+                        help="largest n to determinize (the DFA has 2^n states)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    words = [''.join(rng.choice('ab') for _ in range(args.length)) for _ in range(args.words)]
+    print(f"{args.words} random words of length {args.length}")
+    for n in args.sizes:
+        nfa = parse(nth_from_end(n))
+        simulated, seconds = timed(nfa.accepts_many, words)
+        expected = [len(word) >= n and word[-n] == 'a' for word in words]
+        assert simulated == expected
+        line = f"  n={n:3}  simulate {seconds:7.3f}s"
+        if n <= args.determinize_limit:
+            dfa, build = timed(nfa.subset_construction)
+            ran, run = timed(run_dfa, dfa, words)
+            assert ran == expected
+            line += f"  determinize {build:7.3f}s ({dfa.num_states} states) + run {run:6.3f}s"
+        else:
+            line += "  determinize skipped"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
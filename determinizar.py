@@ -1,173 +1,255 @@
-from typing import List, Set
+from array import array
+from collections import deque
+from itertools import chain, count
 
-def parse(input_str: str):
-    parts = input_str.split(';')
-    num_states = int(parts[0])
-    initial_state_name = parts[1]
-    final_states_names = set(parts[2].strip('{}').split(','))
-    alphabet = set(parts[3].strip('{}').split(','))
+from automaton_core import EPSILON, Automaton as AutomatonCore
 
-    states_dict = {name: State(name, name in final_states_names) for name in set(parts[1]) | final_states_names}
-    
-    for transition in parts[4:]:
-        src_name, symbol, dst_name = map(str.strip, transition.split(','))
-        if src_name not in states_dict:
-            states_dict[src_name] = State(src_name)
-        if dst_name not in states_dict:
-            states_dict[dst_name] = State(dst_name)
-        states_dict[src_name].add_transition(symbol, states_dict[dst_name].name)
+def parse(input_str: str) -> 'Automaton':
+    return Automaton.read(input_str)
 
-    initial_state = states_dict[initial_state_name]
-    final_states = [state for name, state in states_dict.items() if state.final]
 
-    transitions = [transition.split(',') for transition in parts[4:]]
+# --------------------------------------------
 
-    automaton = Automaton(num_states, initial_state, final_states, alphabet, transitions)
-    for state in states_dict.values():
-        automaton.add_state(state)
-    return automaton
+class EpsilonClosures(dict):
+    # Epsilon closure of each state, computed on first lookup. A lookup runs
+    # Tarjan's algorithm from the state over the states not seen yet; every
+    # strongly connected component it completes gets a single closure set,
+    # shared by all its states: the component itself plus the closures of
+    # the components it reaches, which Tarjan always completes first.
+    def __init__(self, epsilon_successors):
+        super().__init__()
+        self.epsilon_successors = epsilon_successors
 
+    def __missing__(self, root):
+        successors_of = self.epsilon_successors
+        index = {root: 0}
+        lowlink = {root: 0}
+        stack = [root]
+        work = [(root, iter(successors_of(root)))]
+        while work:
+            state, successors = work[-1]
+            for successor in successors:
+                if successor in self:
+                    continue
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    work.append((successor, iter(successors_of(successor))))
+                    break
+                # Seen but without a closure yet, so still on the stack
+                lowlink[state] = min(lowlink[state], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[state])
+                if lowlink[state] == index[state]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        component.add(member)
+                        if member == state:
+                            break
+                    closure = set(component)
+                    for member in component:
+                        for successor in successors_of(member):
+                            if successor not in component:
+                                closure |= self[successor]
+                    closure = frozenset(closure)
+                    for member in component:
+                        self[member] = closure
+        return self[root]
 
-# --------------------------------------------
 
-class State:
-    def __init__(self, name: str, final: bool = False):
-        self.name = name
-        self.final = final
-        self.transitions = {}
-
-    def add_transition(self, symbol: str, state: 'State'):
-        if symbol not in self.transitions:
-            self.transitions[symbol] = []
-        self.transitions[symbol].append(state)
-    
-    def __str__(self):
-        return ''.join(f"{self.name},{symbol},{state};" for symbol, states in self.transitions.items() for state in states)
-    
-class Automaton:
-    def __init__(self, num_states: int, initial_state: State, final_states: List[State], alphabet: Set[str], transitions: List[str]):
-        self.num_states = num_states
-        self.initial_state = initial_state
-        self.final_states = final_states
-        self.alphabet = alphabet
-        self.states = {}
-        self.transitions = transitions
-
-    def add_state(self, state: State):
-        self.states[state.name] = state
-
-    def formatted_transitions(self):
-        transitions_str = ''
-        for state in self.states.values():
-            transitions_str += str(state)
-        return transitions_str
-    
+class Automaton(AutomatonCore):
+    __slots__ = ('simulation',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.simulation = None
+
     def __str__(self):
-        return f"{self.num_states};{self.initial_state.name};{{{','.join(state.name for state in self.final_states)}}};{{{','.join(sorted(self.alphabet))}}};{self.formatted_transitions()}"
-
-    def is_deterministic(self):
-        for state in self.states.values():
-            for symbol in self.alphabet:
-                if symbol not in state.transitions:
-                    return False
-                if len(state.transitions[symbol]) > 1:
-                    return False
-        return True
-
-
-    def process_transitions(self):
-        adjacency_list = {}
-        for state in self.states:
-            adjacency_list[state] = {}
-        for src, symbol, dest in self.transitions:
-
-            if symbol not in adjacency_list[src]:
-                adjacency_list[src][symbol] = []
-            adjacency_list[src][symbol].append(dest)
-        return adjacency_list
-
-    def compute_epsilon_closure(self, adjacency_list, epsilon_symbol='&'):
-        epsilon_closures = {}
-        def dfs(state):
-            stack = [state]
-            closure = set()
-            while stack:
-                current = stack.pop()
-                if current not in closure:
-                    closure.add(current)
-                    if current in adjacency_list and epsilon_symbol in adjacency_list[current]:
-                        stack.extend(adjacency_list[current][epsilon_symbol])
-            return closure
-
-        for state in adjacency_list:
-            epsilon_closures[state] = dfs(state)
-        return epsilon_closures
-
-    def verify_if_group_is_final(self, group, final_states):
-        for state in group:
-            if state in final_states:
-                return True
-        return False
-    
-
-    def get_reachable_states(self, adjacency_list, state, symbol):
-        reachable_states = []
-        if state in adjacency_list and symbol in adjacency_list[state]:
-            reachable_states.extend(adjacency_list[state][symbol])
-        return reachable_states
-    
+        states = self.states
+        finals = ','.join(name for state, name in enumerate(states) if self.final[state])
+        transitions = ''.join(f"{states[src]},{self.symbols[symbol]},{states[dest]};"
+                              for src, symbol, dest in self.transitions())
+        return f"{self.declared_states};{states[self.initial]};{{{finals}}};{{{','.join(sorted(self.alphabet))}}};{transitions}"
+
+    def format(self, braces=True, terminated=True):
+        # Output format of a determinized automaton: state names in braces,
+        # every transition ended by ';'
+        return super().format(braces, terminated)
+
+    def compute_epsilon_closure(self, epsilon_symbol=EPSILON, lazy=False):
+        # Epsilon closures of the states, as frozensets of state ids
+        epsilon = self.symbol_id(epsilon_symbol)
+        width = len(self.symbols)
+        offsets = self.offsets
+        targets = self.targets
+        if epsilon < 0:
+            closures = EpsilonClosures(lambda state: ())
+        else:
+            closures = EpsilonClosures(lambda state: targets[offsets[state * width + epsilon]:
+                                                             offsets[state * width + epsilon + 1]])
+        if not lazy:
+            for state in range(len(self.states)):
+                closures[state]
+        return closures
+
+    def compile_simulation(self):
+        # Bitmask form of the automaton: bit i stands for state i and
+        # successors[symbol][i] is the epsilon-closed set of states that
+        # state i moves to on symbol.
+        closures = self.compute_epsilon_closure(lazy=True)
+        num_states = len(self.states)
+        width = len(self.symbols)
+        offsets = self.offsets
+        targets = self.targets
+
+        masks = {}
+        closure_masks = []
+        for state in range(num_states):
+            closure = closures[state]
+            if closure not in masks:
+                mask = 0
+                for i in closure:
+                    mask |= 1 << i
+                masks[closure] = mask
+            closure_masks.append(masks[closure])
+
+        successors = {}
+        epsilon = self.symbol_id(EPSILON)
+        for symbol in range(width):
+            if symbol == epsilon:
+                continue
+            moves = [0] * num_states
+            for state in range(num_states):
+                cell = state * width + symbol
+                mask = 0
+                for i in range(offsets[cell], offsets[cell + 1]):
+                    mask |= closure_masks[targets[i]]
+                moves[state] = mask
+            successors[self.symbols[symbol]] = moves
+
+        final = 0
+        for state in range(num_states):
+            if self.final[state]:
+                final |= 1 << state
+        return closure_masks[self.initial], final, successors
+
+    def accepts(self, word):
+        # Runs the NFA on word (any iterable of symbols) without determinizing
+        if self.simulation is None:
+            self.simulation = self.compile_simulation()
+        current, final, successors = self.simulation
+        for symbol in word:
+            moves = successors.get(symbol)
+            if moves is None:
+                return False
+            states = current
+            current = 0
+            while states:
+                low = states & -states
+                current |= moves[low.bit_length() - 1]
+                states ^= low
+            if not current:
+                return False
+        return current & final != 0
+
+    def accepts_many(self, words):
+        return [self.accepts(word) for word in words]
 
     def determinize(self):
         if self.is_deterministic(): return self
+        return self.subset_construction().format()
+
+    def subset_construction(self) -> 'Automaton':
+        # Subsets are frozensets of state ids, and step(i) maps each symbol
+        # to the epsilon-closed set of states reachable from state i on it.
+        # Closures and steps are only computed for the states the
+        # construction reaches.
+        closures = self.compute_epsilon_closure(lazy=True)
+        names = self.states
+        width = len(self.symbols)
+        offsets = self.offsets
+        targets = self.targets
+        final_ids = {state for state in range(len(names)) if self.final[state]}
+
+        # The DFA keeps every symbol but epsilon
+        epsilon = self.symbol_id(EPSILON)
+        symbols = [symbol for symbol in self.symbols if symbol != EPSILON]
+        symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+        new_symbol = [symbol_ids.get(symbol, -1) for symbol in self.symbols]
+
+        steps = [None] * len(names)
+
+        def step(i):
+            if steps[i] is None:
+                moves = {}
+                for symbol in range(width):
+                    cell = i * width + symbol
+                    if symbol != epsilon and offsets[cell] != offsets[cell + 1]:
+                        reachable = moves[new_symbol[symbol]] = set()
+                        for j in range(offsets[cell], offsets[cell + 1]):
+                            reachable.update(closures[targets[j]])
+                steps[i] = moves
+            return steps[i]
+
+        # Single-character names keep the compact AB form. Longer ones are
+        # joined with a character no name contains, so that {A1|B} and
+        # {A|1B} stay distinct, and that is not a delimiter of the format.
+        separator = ''
+        if any(len(name) != 1 for name in names):
+            separator = next(separator for separator in chain('|+_', map(chr, count(33)))
+                             if separator not in ',;{}' and not any(separator in name for name in names))
+
+        def subset_name(subset):
+            return separator.join(sorted(names[i] for i in subset))
+
+        initial_subset = closures[self.initial]
+        subset_ids = {initial_subset: 0}
+        states = [subset_name(initial_subset)]
+        final = bytearray([not final_ids.isdisjoint(initial_subset)])
+        sources = array('i')
+        labels = array('i')
+        destinations = array('i')
+        worklist = deque([initial_subset])
+        while worklist:
+            subset = worklist.popleft()
+            source = subset_ids[subset]
+
+            moves = {}
+            for i in subset:
+                for symbol, reachable in step(i).items():
+                    moves.setdefault(symbol, set()).update(reachable)
+
+            for symbol, reachable in moves.items():
+                target = frozenset(reachable)
+                destination = subset_ids.get(target)
+                if destination is None:
+                    destination = subset_ids[target] = len(states)
+                    states.append(subset_name(target))
+                    final.append(not final_ids.isdisjoint(target))
+                    worklist.append(target)
+                sources.append(source)
+                labels.append(symbol)
+                destinations.append(destination)
+
+        alphabet = [symbol for symbol in self.alphabet if symbol != EPSILON]
+        return Automaton(states, symbols, 0, final, sources, labels, destinations, alphabet)
+
+def determinize(automaton: Automaton) -> Automaton:
+    # Deterministic automaton equivalent to automaton (itself if it already is)
+    return automaton if automaton.is_deterministic() else automaton.subset_construction()
+
+def solve(input_str: str) -> str:
+    return str(parse(input_str).determinize())
+
+def main():
+    print(solve(input()))
 
-        adjacency_list = self.process_transitions()
-        epsilon_closures = self.compute_epsilon_closure(adjacency_list)
-        new_alphabet = self.alphabet - {'&'}
-
-        new_states = {}
-
-        new_initial_state = ''.join(sorted(epsilon_closures[self.initial_state.name]))
-        
-        transicoes = []
-        lista = [new_initial_state]
-        while lista:
-            state = lista.pop(0)
-            new_states[state] = State(state, self.verify_if_group_is_final(state, [final.name for final in self.final_states]))
-            for symbol in new_alphabet:
-                reachable_states = []
-                for old_state in state:
-                    for new_state in self.get_reachable_states(adjacency_list, old_state, symbol):
-                        reachable_states = list(set(reachable_states + list(epsilon_closures[new_state])))
-                if reachable_states:
-                    new_state = ''.join(sorted(reachable_states))
-                    if (state, symbol, new_state) not in transicoes:
-                        transicoes.append((state, symbol, new_state))
-
-                        if new_state not in new_states:
-                            new_states[new_state] = State(new_state, self.verify_if_group_is_final(new_state, [final.name for final in self.final_states]))
-                            lista.append(new_state)
-                            
-                    # cria transição
-                        new_states[state].add_transition(symbol, new_states[new_state])
-
-        formatted_string = ''
-        formatted_string += f"{len(new_states)};"
-        formatted_string += "{" + str(new_initial_state) + "};"
-        formatted_string += "{" + ','.join(sorted(["{"+ str(state) + "}" for state in new_states if new_states[state].final])) + "};"
-        formatted_string += "{" + ','.join(sorted(new_alphabet)) + "};"
-        # Organizando e formatando as transições
-        sorted_transitions = sorted(
-            transicoes, 
-            key=lambda x: (x[0], x[1])
-        )
-
-        # Concatenando transições formatadas
-        for transition in sorted_transitions:
-            formatted_string += "{" + transition[0] + "}," + transition[1] + ",{" + transition[2] + "};"
-
-        return formatted_string
-
-print(parse(input()).determinize())
+if __name__ == "__main__":
+    main()
 
 # 3;A;{C};{1,2,3,&};A,1,A;A,&,B;B,2,B;B,&,C;C,3,C
 # 4;P;{S};{0,1};P,0,P;P,0,Q;P,1,P;Q,0,R;Q,1,R;R,0,S;S,0,S;S,1,S
@@ -0,0 +1,214 @@
+import argparse
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from automaton_core import Automaton
+
+FORMAT_VERSION = 1
+MAGIC = b'DFAB'
+DENSE = 0
+ROWS = 1
+# magic, format version, layout, number of states, number of symbols,
+# number of declared symbols (the alphabet, first in the symbol table),
+# initial state, size of the symbol names, size of the state names, number
+# of transitions
+HEADER = struct.Struct('<4sHHIIIIIII')
+SEPARATOR = '\0'
+NO_STATE = -1
+
+
+def padded(size):
+    return (size + 3) & ~3
+
+
+def dumps(automaton):
+    # Binary form of a deterministic automaton_core.Automaton. All integers
+    # are little-endian and every section starts 4-byte aligned:
+    #   header
+    #   symbol names, then state names (UTF-8, separated by NUL)
+    #   final-state bitmap (bit i of byte i // 8 for state i)
+    #   dense layout: int32 target per (state, symbol), -1 for none
+    #   rows layout: uint32 row offsets per state, then the uint32 symbols
+    #   and int32 targets of each state's transitions, symbols ascending
+    # The smaller of the two table layouts is written.
+    states = automaton.states
+    symbols = [symbol for symbol in automaton.alphabet if symbol in automaton.symbols]
+    symbols += [symbol for symbol in automaton.symbols if symbol not in symbols]
+    new_symbol = [symbols.index(symbol) for symbol in automaton.symbols]
+    width = len(automaton.symbols)
+    offsets = automaton.offsets
+    targets = automaton.targets
+
+    rows = [[] for _ in states]
+    for cell in range(len(offsets) - 1):
+        count = offsets[cell + 1] - offsets[cell]
+        if count > 1:
+            raise ValueError("Only deterministic automata have a binary form")
+        if count:
+            rows[cell // width].append((new_symbol[cell % width], targets[offsets[cell]]))
+    num_transitions = sum(map(len, rows))
+
+    if len(states) * len(symbols) <= 2 * num_transitions + len(states) + 1:
+        layout = DENSE
+        table = array('i', [NO_STATE]) * (len(states) * len(symbols))
+        for state, row in enumerate(rows):
+            for symbol, target in row:
+                table[state * len(symbols) + symbol] = target
+        sections = [table]
+    else:
+        layout = ROWS
+        row_offsets = array('I', [0])
+        row_symbols = array('I')
+        row_targets = array('i')
+        for row in rows:
+            row.sort()
+            row_symbols.extend(symbol for symbol, _ in row)
+            row_targets.extend(target for _, target in row)
+            row_offsets.append(len(row_symbols))
+        sections = [row_offsets, row_symbols, row_targets]
+    if sys.byteorder == 'big':
+        for section in sections:
+            section.byteswap()
+
+    symbol_names = SEPARATOR.join(symbols).encode('utf-8')
+    state_names = SEPARATOR.join(states).encode('utf-8')
+    final = bytearray(padded((len(states) + 7) // 8))
+    for state in range(len(states)):
+        if automaton.final[state]:
+            final[state >> 3] |= 1 << (state & 7)
+
+    names = symbol_names + state_names
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, layout, len(states), len(symbols), len(automaton.alphabet),
+                         automaton.initial, len(symbol_names), len(state_names), num_transitions)
+    return b''.join([header, names, bytes(padded(len(names)) - len(names)), final] +
+                    [section.tobytes() for section in sections])
+
+
+class BinaryDfa:
+    # Read-only view of a dumps() buffer (bytes, mmap, ...). The final
+    # bitmap and the transition table are used in place through memoryviews,
+    # so processes that mmap the same file share one copy of it.
+    def __init__(self, buffer):
+        (magic, version, self.layout, self.num_states, num_symbols, num_declared, self.initial, symbols_size,
+         states_size, self.num_transitions) = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError('Not a binary DFA of the current format version')
+
+        view = memoryview(buffer)
+        offset = HEADER.size
+        self.symbols = str(view[offset:offset + symbols_size], 'utf-8').split(SEPARATOR) if num_symbols else []
+        self.alphabet = self.symbols[:num_declared]
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.state_names = view[offset + symbols_size:offset + symbols_size + states_size]
+        offset += padded(symbols_size + states_size)
+
+        self.final = view[offset:offset + (self.num_states + 7) // 8]
+        offset += padded((self.num_states + 7) // 8)
+
+        if self.layout == DENSE:
+            sections = [('i', self.num_states * num_symbols)]
+        else:
+            sections = [('I', self.num_states + 1), ('I', self.num_transitions), ('i', self.num_transitions)]
+        tables = []
+        for typecode, size in sections:
+            if sys.byteorder == 'big':
+                table = array(typecode)
+                table.frombytes(view[offset:offset + 4 * size])
+                table.byteswap()
+            else:
+                table = view[offset:offset + 4 * size].cast(typecode)
+            tables.append(table)
+            offset += 4 * size
+        if self.layout == DENSE:
+            self.table, = tables
+        else:
+            self.row_offsets, self.row_symbols, self.row_targets = tables
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @property
+    def states(self):
+        return str(self.state_names, 'utf-8').split(SEPARATOR) if self.num_states else []
+
+    def is_final(self, state):
+        return self.final[state >> 3] >> (state & 7) & 1 == 1
+
+    def step(self, state, symbol):
+        # Target of state on a symbol id, or NO_STATE
+        if self.layout == DENSE:
+            return self.table[state * len(self.symbols) + symbol]
+        start, end = self.row_offsets[state], self.row_offsets[state + 1]
+        i = bisect_left(self.row_symbols, symbol, start, end)
+        return self.row_targets[i] if i < end and self.row_symbols[i] == symbol else NO_STATE
+
+    def accepts(self, word):
+        # word is any iterable of symbols (a str for one-character symbols)
+        symbol_ids = self.symbol_ids
+        step = self.step
+        state = self.initial
+        for symbol in word:
+            symbol = symbol_ids.get(symbol)
+            if symbol is None:
+                return False
+            state = step(state, symbol)
+            if state == NO_STATE:
+                return False
+        return self.is_final(state)
+
+    def to_automaton(self, cls=Automaton):
+        sources = array('i')
+        labels = array('i')
+        destinations = array('i')
+        for state in range(self.num_states):
+            for symbol in range(len(self.symbols)):
+                target = self.step(state, symbol)
+                if target != NO_STATE:
+                    sources.append(state)
+                    labels.append(symbol)
+                    destinations.append(target)
+        final = bytearray(self.is_final(state) for state in range(self.num_states))
+        return cls(self.states, list(self.symbols), self.initial, final, sources, labels, destinations,
+                   list(self.alphabet))
+
+
+def from_text(text):
+    return dumps(Automaton.read(text))
+
+
+def to_text(buffer):
+    return BinaryDfa(buffer).to_automaton().format()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converts DFAs between the text and the binary format.")
+    parser.add_argument('command', choices=('encode', 'decode'))
+    parser.add_argument('input', nargs='?', help="input file (default: stdin)")
+    parser.add_argument('output', nargs='?', help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'encode':
+        text = open(args.input, encoding='utf-8').read() if args.input else sys.stdin.read()
+        data = from_text(text.strip())
+        if args.output:
+            with open(args.output, 'wb') as file:
+                file.write(data)
+        else:
+            sys.stdout.buffer.write(data)
+    else:
+        dfa = BinaryDfa.open(args.input) if args.input else BinaryDfa(sys.stdin.buffer.read())
+        text = dfa.to_automaton().format()
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                file.write(text + '\n')
+        else:
+            print(text)
+
+
+if __name__ == "__main__":
+    main()
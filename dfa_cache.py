@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from dfa_matcher import CompiledDfa, compile
+from regex_to_dfa import CharSet, SyntaxTree
+
+FORMAT_VERSION = 1
+MAGIC = b'RDFA'
+# magic, format version, byte order (0 little, 1 big), num_classes, start,
+# number of class map entries, table length
+HEADER = struct.Struct('<4sHHIIII')
+SUFFIX = '.dfa'
+# Stores between two scans of the directory, which also count the entries
+# other processes wrote
+RESCAN_STORES = 256
+
+
+def normalize(regex):
+    # Canonical text of a regex: explicit concatenation and classes as sorted
+    # symbol lists, so ab and a.b, or [a-c] and [cba], share a cache entry.
+    tokens = SyntaxTree.add_concat(SyntaxTree.__new__(SyntaxTree), regex)
+    return json.dumps([
+        ['^' if token.negated else '', ''.join(sorted(token.chars))] if isinstance(token, CharSet) else token
+        for token in tokens
+    ], ensure_ascii=False)
+
+
+def dump(dfa):
+    codes = array('I', map(ord, dfa.class_of))
+    classes = array('I', dfa.class_of.values())
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, sys.byteorder == 'big', dfa.num_classes, dfa.start,
+                         len(codes), len(dfa.table))
+    return b''.join((header, codes.tobytes(), classes.tobytes(), dfa.table.tobytes(), dfa.accepting.tobytes()))
+
+
+def load(data):
+    magic, version, big_endian, num_classes, start, num_codes, table_size = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError('Not a compiled DFA of the current format version')
+
+    sections = []
+    offset = HEADER.size
+    layout = (('I', num_codes), ('I', num_codes), ('i', table_size), ('i', table_size))
+    expected = HEADER.size + sum(size * array(typecode).itemsize for typecode, size in layout)
+    if len(data) != expected:
+        raise ValueError(f'Compiled DFA of {len(data)} bytes, expected {expected}')
+    if not num_classes or table_size % num_classes or start % num_classes or start >= table_size:
+        raise ValueError('Inconsistent compiled DFA header')
+
+    for typecode, size in layout:
+        section = array(typecode)
+        end = offset + size * section.itemsize
+        section.frombytes(data[offset:end])
+        if big_endian != (sys.byteorder == 'big'):
+            section.byteswap()
+        sections.append(section)
+        offset = end
+    codes, classes, table, accepting = sections
+
+    class_of = dict(zip(map(chr, codes), classes))
+    return CompiledDfa(class_of, num_classes, table, accepting, start)
+
+
+class DfaCache:
+    # Content-addressed directory of compiled DFAs. Entries are written to a
+    # temporary file and renamed into place, so concurrent writers never
+    # expose a partial file; once the directory grows past max_bytes the
+    # least recently used entries (by mtime, refreshed on every hit) are
+    # removed until it is back to three quarters of that. The size of the
+    # directory is kept as a running total, so it is only scanned when that
+    # total passes max_bytes or every RESCAN_STORES stores.
+    def __init__(self, directory, max_bytes=64 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = None
+        self.stores = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, regex):
+        text = json.dumps([FORMAT_VERSION, normalize(regex)], ensure_ascii=False)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def get(self, regex):
+        path = self.path(self.key(regex))
+        try:
+            with open(path, 'rb') as file:
+                dfa = load(file.read())
+        except (OSError, ValueError, struct.error):
+            self.misses += 1
+            dfa = compile(regex)
+            self.store(path, dfa)
+            return dfa
+
+        self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return dfa
+
+    def store(self, path, dfa):
+        data = dump(dfa)
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+        self.stores += 1
+        if self.size is not None:
+            self.size += len(data)
+        if self.size is None or self.size > self.max_bytes or self.stores % RESCAN_STORES == 0:
+            self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        entries.sort()
+        limit = self.max_bytes if total <= self.max_bytes else self.max_bytes * 3 // 4
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.unlink(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.size = total
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
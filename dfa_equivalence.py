@@ -0,0 +1,172 @@
+from collections import deque
+
+from automaton_core import EPSILON, Automaton
+from dfa_matcher import DEAD, CompiledDfa
+from regex_to_dfa import ConvertToDfa
+
+
+class DfaView:
+    # Uniform access to a DFA: step(state, symbol) gives the next state, or
+    # None for the (implicit) dead state. symbols are the symbols the DFA
+    # tells apart; when open_alphabet is set, every other symbol behaves
+    # like any one of them not in symbols (class 0 of a regex DFA).
+    def __init__(self, initial, symbols, step, is_final, open_alphabet=False):
+        self.initial = initial
+        self.symbols = symbols
+        self.step = step
+        self.is_final = is_final
+        self.open_alphabet = open_alphabet
+
+
+def view(dfa):
+    # DfaView of an automaton_core Automaton (a determinizar automaton is
+    # determinized first if needed), a converted regex_to_dfa.ConvertToDfa
+    # or a dfa_matcher.CompiledDfa.
+    if isinstance(dfa, DfaView):
+        return dfa
+
+    if isinstance(dfa, Automaton):
+        width = len(dfa.symbols)
+        offsets = dfa.offsets
+        counts = [offsets[cell + 1] - offsets[cell] for cell in range(len(offsets) - 1)]
+        epsilon = dfa.symbol_id(EPSILON)
+        if max(counts, default=0) > 1 or epsilon >= 0 and any(counts[epsilon::width]):
+            if not hasattr(dfa, 'subset_construction'):
+                raise ValueError("Automaton is not deterministic")
+            dfa = dfa.subset_construction()
+            width = len(dfa.symbols)
+            offsets = dfa.offsets
+        targets = dfa.targets
+        symbol_ids = {symbol: i for i, symbol in enumerate(dfa.symbols) if symbol != EPSILON}
+
+        def step(state, symbol):
+            symbol = symbol_ids.get(symbol)
+            if symbol is None:
+                return None
+            cell = state * width + symbol
+            return targets[offsets[cell]] if offsets[cell] != offsets[cell + 1] else None
+
+        return DfaView(dfa.initial, set(symbol_ids), step, dfa.final.__getitem__)
+
+    if isinstance(dfa, ConvertToDfa):
+        if dfa.initial_state is None:
+            raise ValueError("ConvertToDfa has not been converted")
+        class_of = dfa.tree.class_of
+        final_number = dfa.final_number
+        return DfaView(dfa.initial_state, set(class_of),
+                       lambda state, symbol: state.Dtran.get(class_of.get(symbol, 0)),
+                       lambda state: final_number in state.statenumber, True)
+
+    if isinstance(dfa, CompiledDfa):
+        class_of = dfa.class_of
+        table = dfa.table
+
+        def step(state, symbol):
+            state = table[state + class_of.get(symbol, 0)]
+            return None if state == DEAD else state
+
+        return DfaView(dfa.start, set(class_of), step, lambda state: dfa.accepting[state] != 0, True)
+
+    raise TypeError(f"Not a supported DFA: {type(dfa).__name__}")
+
+
+def joint_alphabet(first, second):
+    # Symbols of both DFAs, plus one symbol neither mentions when either
+    # treats unknown symbols as a class of their own
+    symbols = first.symbols | second.symbols
+    alphabet = sorted(symbols)
+    if first.open_alphabet or second.open_alphabet:
+        code = 0
+        while chr(code) in symbols:
+            code += 1
+        alphabet.append(chr(code))
+    return alphabet
+
+
+def is_final(dfa, state):
+    return state is not None and bool(dfa.is_final(state))
+
+
+def step(dfa, state, symbol):
+    return None if state is None else dfa.step(state, symbol)
+
+
+def shortest_word(first, second, alphabet, bad):
+    # Breadth-first search of the product automaton for a shortest word
+    # leading to a pair of states with bad(p, q) true. Pairs of dead states
+    # are not expanded.
+    start = (first.initial, second.initial)
+    parent = {start: None}
+    queue = deque([start])
+    while queue:
+        pair = queue.popleft()
+        if bad(*pair):
+            word = []
+            while parent[pair] is not None:
+                pair, symbol = parent[pair]
+                word.append(symbol)
+            return word[::-1]
+        p, q = pair
+        for symbol in alphabet:
+            successor = (step(first, p, symbol), step(second, q, symbol))
+            if successor not in parent and successor != (None, None):
+                parent[successor] = (pair, symbol)
+                queue.append(successor)
+    return None
+
+
+def equivalent(first, second):
+    # Hopcroft-Karp: states are merged in a union-find as soon as they are
+    # assumed equivalent, so each merge is checked once and the cost is
+    # near-linear in the size of the two DFAs.
+    first, second = view(first), view(second)
+    alphabet = joint_alphabet(first, second)
+    parent = {}
+
+    def find(node):
+        root = node
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while node != root:
+            parent[node], node = root, parent.get(node, node)
+        return root
+
+    start = ((0, first.initial), (1, second.initial))
+    parent[start[0]] = start[1]
+    queue = deque([start])
+    while queue:
+        (_, p), (_, q) = queue.popleft()
+        if is_final(first, p) != is_final(second, q):
+            return False
+        for symbol in alphabet:
+            p_next = (0, step(first, p, symbol))
+            q_next = (1, step(second, q, symbol))
+            p_root, q_root = find(p_next), find(q_next)
+            if p_root != q_root:
+                parent[p_root] = q_root
+                queue.append((p_next, q_next))
+    return True
+
+
+def difference(first, second):
+    # A shortest word accepted by exactly one of the DFAs (as a list of
+    # symbols), or None when they are equivalent. A symbol that none of the
+    # DFAs mentions stands for all such symbols.
+    first, second = view(first), view(second)
+    if equivalent(first, second):
+        return None
+    return shortest_word(first, second, joint_alphabet(first, second),
+                         lambda p, q: is_final(first, p) != is_final(second, q))
+
+
+def inclusion_counterexample(first, second):
+    # A shortest word accepted by first but not by second, or None when the
+    # language of first is included in that of second. Only the product
+    # states reachable before the first counterexample are built.
+    first, second = view(first), view(second)
+    return shortest_word(first, second, joint_alphabet(first, second),
+                         lambda p, q: is_final(first, p) and not is_final(second, q))
+
+
+def included(first, second):
+    return inclusion_counterexample(first, second) is None
@@ -0,0 +1,146 @@
+from array import array
+
+from regex_to_dfa import ConvertToDfa, SyntaxTree
+
+DEAD = 0
+
+
+class SymbolClasses(dict):
+    # str.translate table sending every code point that no leaf mentions to
+    # class 0.
+    def __missing__(self, code):
+        return 0
+
+
+class CompiledDfa:
+    # Dense transition table over the symbol classes of SyntaxTree, with one
+    # column per class (class_of maps symbols to classes, anything else is
+    # class 0). States are stored as row offsets (state number *
+    # num_classes), so a step is table[state + symbol_class]; row 0 is the
+    # dead state.
+    def __init__(self, class_of, num_classes, table, accepting, start):
+        self.class_of = class_of
+        self.num_classes = num_classes
+        self.table = table
+        self.accepting = accepting
+        self.start = start
+
+        self.str_classes = SymbolClasses((ord(symbol), symbol_class) for symbol, symbol_class in class_of.items())
+        self.bytes_classes = [self.str_classes[code] for code in range(256)]
+        self.starting = bytearray(1 if table[start + c] != DEAD else 0 for c in range(self.num_classes))
+
+    @classmethod
+    def from_converter(cls, converter, accept=None):
+        # accept(state) gives the accepting value of a DFA state (0 when it
+        # does not accept); by default 1 for states holding the end marker.
+        if accept is None:
+            accept = lambda state: 1 if converter.final_number in state.statenumber else 0
+
+        states = converter.discovered_order
+        num_classes = len(converter.tree.classes)
+        row = {state: (i + 1) * num_classes for i, state in enumerate(states)}
+
+        table = array('i', [DEAD]) * ((len(states) + 1) * num_classes)
+        accepting = array('i', [0]) * len(table)
+        for state in states:
+            accepting[row[state]] = accept(state)
+            for symbol_class, target in state.Dtran.items():
+                table[row[state] + symbol_class] = row[target]
+
+        return cls(converter.tree.class_of, num_classes, table, accepting, row[converter.initial_state])
+
+    @property
+    def num_states(self):
+        return len(self.table) // self.num_classes
+
+    def symbol_classes(self, text):
+        # Maps text (str or bytes) to its sequence of symbol classes; bytes
+        # are read as latin-1 code points.
+        if isinstance(text, str):
+            text = text.translate(self.str_classes)
+            return text.encode('latin-1') if self.num_classes <= 256 else list(map(ord, text))
+        if self.num_classes <= 256:
+            return bytes(text).translate(bytes(self.bytes_classes))
+        return [self.bytes_classes[code] for code in text]
+
+    def longest(self, classes, pos):
+        table = self.table
+        accepting = self.accepting
+        state = self.start
+        end = pos if accepting[state] else None
+        for i in range(pos, len(classes)):
+            state = table[state + classes[i]]
+            if state == DEAD:
+                break
+            if accepting[state]:
+                end = i + 1
+        return end
+
+    def fullmatch(self, text):
+        table = self.table
+        state = self.start
+        for symbol_class in self.symbol_classes(text):
+            state = table[state + symbol_class]
+            if state == DEAD:
+                return False
+        return self.accepting[state] != 0
+
+    def match(self, text, pos=0):
+        # End of the longest match starting at pos, or None.
+        return self.longest(self.symbol_classes(text), pos)
+
+    def advance(self, attempts, best, pos, symbol_class):
+        # One step of a leftmost-longest search over the symbol class at
+        # pos. attempts maps states to the start of the attempt in them,
+        # ordered by start, and best is the (start, end) found so far or
+        # None. Attempts in the same state have the same future, so only the
+        # leftmost is kept, and once one accepts no attempt starting after
+        # it can win: later ones are dropped and none is begun. Returns the
+        # new attempts and best.
+        table = self.table
+        accepting = self.accepting
+        initial = self.start
+        if best is None and initial not in attempts and self.starting[symbol_class]:
+            attempts[initial] = pos
+
+        stepped = {}
+        for state, start in attempts.items():
+            state = table[state + symbol_class]
+            if state != DEAD and state not in stepped:
+                stepped[state] = start
+
+        for state, start in stepped.items():
+            if accepting[state]:
+                if best is None or start < best[0]:
+                    stepped = {state: first for state, first in stepped.items() if first <= start}
+                return stepped, (start, pos + 1)
+        return stepped, best
+
+    def search(self, text, pos=0):
+        # (start, end) of the leftmost-longest match, or None, in one
+        # forward pass with the attempts from every start run together (see
+        # advance).
+        classes = self.symbol_classes(text)
+        advance = self.advance
+        starting = self.starting
+        size = len(classes)
+
+        attempts = {}
+        best = None
+        if self.accepting[self.start] and pos <= size:
+            attempts[self.start] = pos
+            best = (pos, pos)
+        for i in range(pos, size):
+            if not attempts:
+                if best is not None:
+                    break
+                if not starting[classes[i]]:
+                    continue
+            attempts, best = advance(attempts, best, i, classes[i])
+        return best
+
+
+def compile(regex):
+    converter = ConvertToDfa(tree=SyntaxTree(regex))
+    converter.convert()
+    return CompiledDfa.from_converter(converter)
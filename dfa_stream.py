@@ -0,0 +1,138 @@
+import mmap
+import os
+
+from dfa_matcher import DEAD
+
+CHUNK_SIZE = 1 << 16
+
+
+class StreamScanner:
+    # Leftmost-longest, non-overlapping matching over input fed in chunks of
+    # symbol classes, in one forward pass. The attempts from every start run
+    # together and are stepped by CompiledDfa.advance, as in search; a lone
+    # attempt (start, state) is walked without the dict. All of this is
+    # carried from one chunk to the next; the only input kept around is
+    # what follows a found match that the attempts are still trying to
+    # extend, as the next match may start there.
+    def __init__(self, pattern):
+        if pattern.num_classes > 256:
+            raise ValueError("Streaming needs at most 256 symbol classes")
+
+        self.pattern = pattern
+        self.pending = bytearray()
+        self.base = 0
+        self.pos = 0
+        self.start = None
+        self.state = DEAD
+        self.attempts = {}
+        self.best = None
+
+    def feed(self, classes, final=False):
+        advance = self.pattern.advance
+        table = self.pattern.table
+        accepting = self.pattern.accepting
+        starting = self.pattern.starting
+        initial = self.pattern.start
+        nullable = accepting[initial] != 0
+
+        self.pending += classes
+        buf = self.pending
+        base = self.base
+        limit = base + len(buf)
+        pos, start, state, attempts, best = self.pos, self.start, self.state, self.attempts, self.best
+        matches = []
+
+        while True:
+            if start is None and not attempts:
+                if best is not None:
+                    matches.append(best)
+                    pos = best[1] if best[1] > best[0] else best[0] + 1
+                    best = None
+                if not nullable:
+                    while pos < limit and not starting[buf[pos - base]]:
+                        pos += 1
+                if pos > limit or pos == limit and not (final and nullable):
+                    break
+                start, state = pos, initial
+                if nullable:
+                    best = (pos, pos)
+
+            if start is not None:
+                while pos < limit:
+                    symbol_class = buf[pos - base]
+                    if best is None and starting[symbol_class] and state != initial:
+                        break
+                    state = table[state + symbol_class]
+                    if state == DEAD:
+                        break
+                    pos += 1
+                    if accepting[state]:
+                        best = (start, pos)
+                else:
+                    if not final:
+                        break
+                    state = DEAD
+                if state == DEAD:
+                    start = None
+                    continue
+                # Another attempt begins at pos
+                attempts = {state: start}
+                start = None
+
+            if pos == limit:
+                if not final:
+                    break
+                attempts = {}
+                continue
+
+            attempts, best = advance(attempts, best, pos, buf[pos - base])
+            pos += 1
+            if len(attempts) == 1:
+                (state, start), = attempts.items()
+                attempts = {}
+
+        keep = min(pos if best is None else best[1], limit)
+        del buf[:keep - base]
+
+        self.base = keep
+        self.pos, self.start, self.state, self.attempts, self.best = pos, start, state, attempts, best
+        return matches
+
+
+def read_chunks(source, chunk_size=CHUNK_SIZE):
+    # Yields memoryview chunks of a path, a binary file object, an mmap or
+    # any bytes-like object, without reading the whole input at once.
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            yield from read_chunks(file, chunk_size)
+    elif isinstance(source, mmap.mmap) or not hasattr(source, 'read'):
+        view = memoryview(source)
+        for i in range(0, len(view), chunk_size):
+            yield view[i:i + chunk_size]
+    elif hasattr(source, 'readinto'):
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while True:
+            size = source.readinto(buffer)
+            if not size:
+                break
+            yield view[:size]
+    else:
+        while True:
+            data = source.read(chunk_size)
+            if not data:
+                break
+            yield memoryview(data)
+
+
+def finditer(pattern, source, chunk_size=CHUNK_SIZE):
+    # Yields the (start, end) byte offsets of the matches of a CompiledDfa
+    # in source.
+    scanner = StreamScanner(pattern)
+    classes = bytes(pattern.bytes_classes)
+    buffer = bytearray()
+    for chunk in read_chunks(source, chunk_size):
+        # Copied into one reused buffer, as memoryviews have no translate
+        buffer[:] = chunk
+        yield from scanner.feed(buffer.translate(classes))
+    yield from scanner.feed(b'', final=True)
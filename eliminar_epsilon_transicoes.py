@@ -102,5 +102,6 @@ def test_parse():
     print(grammar.nullables)   
     print(grammar.create_prods_combinations)
 
-test_parse()
+if __name__ == "__main__":
+    test_parse()
 
@@ -13,69 +13,177 @@ def parse_input(input):
                 productions[left] = [right]
     return productions
 
-# Get the first set of a given production
-def first_set(productions, production):
-    first = set()
-    if production in productions:
-        for right in productions[production]:
-            if right == '&':
-                first.add('&')
-            elif right[0].islower():
-                first.add(right[0])
+# Symbols of a right side; '&' is the empty word and uppercase symbols
+# are nonterminals
+def symbols_of(right):
+    return [symbol for symbol in right if symbol != '&']
+
+# Nonterminals that derive the empty word. Each production counts its
+# symbols not yet known to be nullable and each nonterminal is processed
+# once, so this is linear in the grammar size.
+def nullable_set(productions):
+    nullable = set()
+    remaining = {}
+    occurrences = {}
+    queue = []
+    for left, rights in productions.items():
+        for i, right in enumerate(rights):
+            symbols = symbols_of(right)
+            if not all(symbol.isupper() for symbol in symbols):
+                continue
+            remaining[left, i] = len(symbols)
+            for symbol in symbols:
+                occurrences.setdefault(symbol, []).append((left, i))
+            if not symbols:
+                queue.append(left)
+    while queue:
+        symbol = queue.pop()
+        if symbol in nullable:
+            continue
+        nullable.add(symbol)
+        for key in occurrences.get(symbol, ()):
+            remaining[key] -= 1
+            if not remaining[key]:
+                queue.append(key[0])
+    return nullable
+
+# DeRemer and Pennello's digraph algorithm: the smallest sets with
+# F(x) = base(x) | F(y) for every edge x -> y, in one pass of Tarjan's
+# algorithm. All the nodes of a cycle get the same set, computed once
+# from the sets of the components it reaches, which are completed first.
+def digraph(nodes, edges, base):
+    result = {}
+    index = {}
+    lowlink = {}
+    stack = []
+    for root in nodes:
+        if root in result:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        work = [(root, iter(edges.get(root, ())))]
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor in result:
+                    continue
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    work.append((successor, iter(edges.get(successor, ()))))
+                    break
+                # Seen but not completed, so still on the stack
+                lowlink[node] = min(lowlink[node], index[successor])
             else:
-                for symbol in right:
-                    if symbol.isupper():
-                        first = first.union(first_set(productions, symbol))
-                        if '&' not in first:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        component.append(member)
+                        if member == node:
                             break
-                    else:
-                        first.add(symbol)
-                        break
-    return first
+                    value = set()
+                    for member in component:
+                        value.update(base.get(member, ()))
+                        for successor in edges.get(member, ()):
+                            if successor in result:
+                                value |= result[successor]
+                    value = frozenset(value)
+                    for member in component:
+                        result[member] = value
+    return result
+
+# First sets of all nonterminals: FIRST(A) includes FIRST(B) for every B
+# in a nullable prefix of a production of A
+def first_sets(productions, nullable=None):
+    if nullable is None:
+        nullable = nullable_set(productions)
+    base = {left: set() for left in productions}
+    edges = {left: [] for left in productions}
+    for left, rights in productions.items():
+        for right in rights:
+            for symbol in symbols_of(right):
+                if not symbol.isupper():
+                    base[left].add(symbol)
+                    break
+                edges[left].append(symbol)
+                if symbol not in nullable:
+                    break
+    first = digraph(productions, edges, base)
+    return {left: first[left] | {'&'} if left in nullable else set(first[left]) for left in productions}
+
+# Follow sets of all nonterminals: for a production A = xBy, FOLLOW(B)
+# includes the first set of y, and FOLLOW(A) when y is nullable
+def follow_sets(productions, start, first=None, nullable=None):
+    if nullable is None:
+        nullable = nullable_set(productions)
+    if first is None:
+        first = first_sets(productions, nullable)
+    base = {left: set() for left in productions}
+    edges = {left: [] for left in productions}
+    if start in base:
+        base[start].add('$')
+    for left, rights in productions.items():
+        for right in rights:
+            # Walk the right side backwards, keeping the first set of the
+            # suffix after the current symbol and whether it is nullable
+            trailer = set()
+            nullable_suffix = True
+            for symbol in reversed(symbols_of(right)):
+                if not symbol.isupper():
+                    trailer = {symbol}
+                    nullable_suffix = False
+                    continue
+                base.setdefault(symbol, set()).update(trailer)
+                if nullable_suffix:
+                    edges.setdefault(symbol, []).append(left)
+                symbol_first = first.get(symbol, set()) - {'&'}
+                if symbol in nullable:
+                    trailer = trailer | symbol_first
+                else:
+                    trailer = symbol_first
+                    nullable_suffix = False
+    follow = digraph(productions, edges, base)
+    return {left: set(follow[left]) for left in productions}
+
+# Get the first set of a given production
+def first_set(productions, production):
+    return first_sets(productions).get(production, set())
 
 # Get the follow set of a given production
 def follow_set(productions, production, start):
-    follow = set()
-    if production == start:
-        follow.add('$')
-    for left in productions:
-        for right in productions[left]:
-            for i in range(len(right)):
-                if right[i] == production:
-                    if i == len(right) - 1:
-                        if left != production:
-                            follow = follow.union(follow_set(productions, left, start))
-                    else:
-                        if right[i + 1].isupper():
-                            first_of_next = first_set(productions, right[i + 1])
-                            if '&' in first_of_next:
-                                first_of_next.remove('&')
-                                follow = follow.union(first_of_next)
-                                follow = follow.union(follow_set(productions, left, start))
-                            else:
-                                follow = follow.union(first_of_next)
-                        else:
-                            follow.add(right[i + 1])
-    return follow
+    return follow_sets(productions, start).get(production, set())
 
 # Get the first and follow sets of a given set of productions
 def first_follow(productions):
-    first = {}
-    follow = {}
-    for production in productions:
-        first[production] = first_set(productions, production)
-    for production in productions:
-        follow[production] = follow_set(productions, production, list(productions.keys())[0])
+    nullable = nullable_set(productions)
+    first = first_sets(productions, nullable)
+    follow = follow_sets(productions, next(iter(productions), None), first, nullable)
     return first, follow
 
-# Print the first and follow sets
-def print_first_follow(first, follow):
+# Format the first and follow sets
+def format_first_follow(first, follow):
     first_str = "; ".join([f"First({prod}) = {{{', '.join(sorted(first[prod]))}}}" for prod in first])
     follow_str = "; ".join([f"Follow({prod}) = {{{', '.join(sorted(follow[prod]))}}}" for prod in follow])
-    print(f"{first_str}; {follow_str};")
+    return f"{first_str}; {follow_str};"
+
+# Print the first and follow sets
+def print_first_follow(first, follow):
+    print(format_first_follow(first, follow))
+
+# First and follow sets of one input line, formatted
+def solve(input_):
+    productions = parse_input(input_)
+    first, follow = first_follow(productions)
+    return format_first_follow(first, follow)
 
 # Main
-input_ = input()
-productions = parse_input(input_)
-first, follow = first_follow(productions)
-print_first_follow(first, follow)
\ No newline at end of file
+def main():
+    print(solve(input()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import sys
+from collections import OrderedDict
+
+from regex_to_dfa import EMPTY, SyntaxTree
+
+FLUSH = 'flush'
+LRU = 'lru'
+
+
+class LazyDfa:
+    # Matches against the DFA of a regex without building it: states are
+    # followpos position sets created only when the input reaches them, and
+    # kept in a bounded cache.
+    def __init__(self, regex, max_states=10000, max_bytes=None, policy=FLUSH):
+        if policy not in (FLUSH, LRU):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+
+        self.tree = SyntaxTree(regex)
+        self.initial_state = self.tree.root.firstpos
+        self.final_number = self.tree.leaves[-1].number
+        self.max_states = max_states
+        self.max_bytes = max_bytes
+        self.policy = policy
+
+        self.cache = OrderedDict()
+        self.cache_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self.evictions = 0
+
+    def transitions(self, state):
+        entry = self.cache.get(state)
+        if entry is not None:
+            self.hits += 1
+            if self.policy == LRU:
+                self.cache.move_to_end(state)
+            return entry[0]
+
+        self.misses += 1
+        moves = self.tree.move(state)
+        self.store(state, moves)
+        return moves
+
+    def store(self, state, moves):
+        size = self.state_size(state, moves)
+        while self.cache and (len(self.cache) >= self.max_states or
+                              self.max_bytes is not None and self.cache_bytes + size > self.max_bytes):
+            if self.policy == FLUSH:
+                self.cache.clear()
+                self.cache_bytes = 0
+                self.flushes += 1
+            else:
+                _, (_, evicted_size) = self.cache.popitem(last=False)
+                self.cache_bytes -= evicted_size
+                self.evictions += 1
+
+        self.cache[state] = (moves, size)
+        self.cache_bytes += size
+
+    def state_size(self, state, moves):
+        return sys.getsizeof(state.bits) + sys.getsizeof(moves) + \
+            sum(sys.getsizeof(target.bits) for target in moves.values())
+
+    def is_final(self, state):
+        return self.final_number in state
+
+    def accepts(self, word):
+        state = self.initial_state
+        class_of = self.tree.class_of
+        for symbol in word:
+            state = self.transitions(state).get(class_of.get(symbol, 0), EMPTY)
+            if not state:
+                return False
+        return self.is_final(state)
+
+    def match(self, word):
+        # Length of the longest accepted prefix of word, or None.
+        state = self.initial_state
+        longest = 0 if self.is_final(state) else None
+        class_of = self.tree.class_of
+        for i, symbol in enumerate(word):
+            state = self.transitions(state).get(class_of.get(symbol, 0), EMPTY)
+            if not state:
+                break
+            if self.is_final(state):
+                longest = i + 1
+        return longest
+
+    def stats(self):
+        return {
+            'states': len(self.cache),
+            'bytes': self.cache_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'flushes': self.flushes,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,70 @@
+from collections import namedtuple
+
+from dfa_matcher import DEAD, CompiledDfa
+from regex_to_dfa import ConvertToDfa, PositionSet, SyntaxTree
+
+Token = namedtuple('Token', ['type', 'value', 'pos'])
+
+
+class LexerSyntaxTree(SyntaxTree):
+    # Alternation of all token patterns, each ending with its own end
+    # marker, so end_markers[i] is the end marker of patterns[i].
+    def add_end_marker(self, patterns):
+        tokens = []
+        for pattern in patterns:
+            if tokens:
+                tokens.append('|')
+            tokens += SyntaxTree.add_end_marker(self, pattern)
+        return tokens
+
+
+class Lexer:
+    # Tokenizes with one DFA for all rules: (name, regex) pairs in priority
+    # order. The longest match wins and ties go to the earliest rule; tokens
+    # of rules named None are matched but not returned.
+    def __init__(self, rules):
+        self.names = [name for name, _ in rules]
+
+        tree = LexerSyntaxTree([regex for _, regex in rules])
+        converter = ConvertToDfa(tree=tree)
+        converter.convert()
+
+        markers = PositionSet()
+        for number in tree.end_markers:
+            markers = markers | PositionSet.single(number)
+        rule_of = {number: i + 1 for i, number in enumerate(tree.end_markers)}
+
+        def accept(state):
+            # Marker positions grow with the rule index, so the lowest one in
+            # the state belongs to the highest-priority rule.
+            return next((rule_of[number] for number in state.statenumber & markers), 0)
+
+        self.dfa = CompiledDfa.from_converter(converter, accept)
+
+    def tokenize(self, text):
+        table = self.dfa.table
+        accepting = self.dfa.accepting
+        start = self.dfa.start
+        classes = self.dfa.symbol_classes(text)
+        size = len(classes)
+
+        pos = 0
+        while pos < size:
+            state = start
+            rule = 0
+            end = pos
+            for i in range(pos, size):
+                state = table[state + classes[i]]
+                if state == DEAD:
+                    break
+                if accepting[state]:
+                    rule = accepting[state]
+                    end = i + 1
+
+            if end == pos:
+                raise ValueError(f"No token matches at position {pos}")
+
+            name = self.names[rule - 1]
+            if name is not None:
+                yield Token(name, text[pos:end], pos)
+            pos = end
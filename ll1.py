@@ -1,6 +1,16 @@
-from collections import defaultdict
+import gc
+from array import array
+from collections import defaultdict, namedtuple
+from heapq import heapify, heappop, heappush
+from itertools import chain, repeat
 
 EPSILON = "&"
+EPSILON_ID = 0
+END_ID = 1
+
+# Node of a parse tree: the nonterminal, the number of the rule expanding it
+# and its children, nodes for nonterminals and the input tokens for terminals
+ParseTree = namedtuple('ParseTree', ['symbol', 'rule', 'children'])
 
 class GrammarParser:
     def __init__(self):
@@ -8,9 +18,13 @@ class GrammarParser:
         self.nonterminals = []
         self.terminals = []
         self.rules = []
+        self.symbol_ids = {}
+        self.symbol_names = []
+        self.productions = []
         self.firsts = defaultdict(list)
         self.follows = defaultdict(list)
         self.rule_table = defaultdict(lambda: defaultdict(str))
+        self.conflicts = []
         
     def grammar_changed(self, grammar_text):
         self.rules = [line.strip() for line in grammar_text.strip().split('\n') if line.strip()]
@@ -56,122 +70,222 @@ class GrammarParser:
         return "\n".join(lines)
 
     def make_rule_table(self):
+        # A cell claimed by two rules keeps the later one, as the table is
+        # still displayed for grammars that are not LL(1); conflicts lists
+        # those cells as (nonterminal, terminal)
         self.rule_table = defaultdict(lambda: defaultdict(str))
+        self.conflicts = []
+        names = self.symbol_names
         
-        for idx, rule in enumerate(self.rules):
-            nonterminal, development = map(str.strip, rule.split('->'))
-            development = self.trim_elements(development.split())
-            development_firsts = self.collect_firsts3(development)
+        for idx, (nonterminal, _) in enumerate(self.productions):
+            development_firsts = self.suffix_firsts[idx][0][1]
+            row = self.rule_table[names[nonterminal]]
             rule_number = str(idx + 1)
             
             for symbol in development_firsts:
-                if symbol != EPSILON:
-                    self.rule_table[nonterminal][symbol] = rule_number
-                else:
-                    for symbol2 in self.follows[nonterminal]:
-                        self.rule_table[nonterminal][symbol2] = rule_number
+                lookaheads = self.follow_order[nonterminal] if symbol == EPSILON_ID else (symbol,)
+                for lookahead in lookaheads:
+                    if row[names[lookahead]] not in ('', rule_number):
+                        self.conflicts.append((names[nonterminal], names[lookahead]))
+                    row[names[lookahead]] = rule_number
 
-    def collect_firsts(self):
-        not_done = True
+    def fixpoint(self, evaluate, users):
+        # Runs evaluate(rule), which returns the symbols whose sets grew,
+        # until no set changes. Rules run in rounds in rule order, as in full
+        # sweeps over the rules, but only when a set they read (users[symbol]
+        # lists the rules reading symbol's set) has grown since their last
+        # run, so the sets are filled in the same order as by full sweeps.
+        count = len(self.productions)
+        queued = bytearray(b'\1') * count
+        current = list(range(count))
         
-        while not_done:
-            not_done = False
+        while current:
+            heapify(current)
+            later = []
             
-            for rule in self.rules:
-                nonterminal, development = map(str.strip, rule.split('->'))
-                development = self.trim_elements(development.split())
+            while current:
+                rule = heappop(current)
+                queued[rule] = 0
                 
-                if development == [EPSILON]:
-                    not_done |= self.add_unique(EPSILON, self.firsts[nonterminal])
-                else:
-                    not_done |= self.collect_firsts4(development, nonterminal)
+                for symbol in evaluate(rule):
+                    for user in users[symbol]:
+                        if not queued[user]:
+                            queued[user] = 1
+                            if user > rule:
+                                heappush(current, user)
+                            else:
+                                later.append(user)
+            
+            current = later
+
+    def merge(self, bits, order, target, new_bits, source_order):
+        # Adds the symbols of the bitset new_bits to set target, in
+        # source_order; returns whether the set grew
+        new = new_bits & ~bits[target]
+        if not new:
+            return False
+        bits[target] |= new
+        order[target].extend(symbol for symbol in source_order if new >> symbol & 1)
+        return True
+
+    def collect_firsts(self):
+        size = len(self.symbol_names)
+        self.first_bits = [0] * size
+        self.first_order = [[] for _ in range(size)]
+        users = [[] for _ in range(size)]
+        for idx, (_, development) in enumerate(self.productions):
+            for symbol in set(development):
+                users[symbol].append(idx)
+        
+        self.fixpoint(self.collect_rule_firsts, users)
+        
+        names = self.symbol_names
+        self.firsts = defaultdict(list)
+        for nonterminal in self.nonterminals:
+            symbol = self.symbol_ids[nonterminal]
+            self.firsts[nonterminal] = [names[first] for first in self.first_order[symbol]]
+        self.suffix_firsts = [self.sequence_firsts(development) for _, development in self.productions]
 
-    def collect_firsts4(self, development, nonterminal_firsts):
+    def collect_rule_firsts(self, idx):
+        nonterminal, development = self.productions[idx]
+        bits = self.first_bits
+        order = self.first_order
+        
+        # The firsts of each symbol of the nullable prefix, without their
+        # EPSILON, which only the whole development being nullable adds
         result = False
-        epsilon_in_symbol_firsts = True
         
         for symbol in development:
-            epsilon_in_symbol_firsts = False
-
-            if symbol in self.terminals:
-                result |= self.add_unique(symbol, self.firsts[nonterminal_firsts])
+            if symbol == EPSILON_ID:
+                continue
+            
+            if self.is_terminal[symbol]:
+                result |= self.merge(bits, order, nonterminal, 1 << symbol, (symbol,))
                 break
             
-            for first in self.firsts[symbol]:
-                epsilon_in_symbol_firsts |= first == EPSILON
-                result |= self.add_unique(first, self.firsts[nonterminal_firsts])
+            result |= self.merge(bits, order, nonterminal, bits[symbol] & ~1, order[symbol])
             
-            if not epsilon_in_symbol_firsts:
+            if not bits[symbol] & 1:
                 break
+        else:
+            result |= self.merge(bits, order, nonterminal, 1, (EPSILON_ID,))
         
-        if epsilon_in_symbol_firsts:
-            result |= self.add_unique(EPSILON, self.firsts[nonterminal_firsts])
-        
-        return result
+        return [nonterminal] if result else []
 
-    def collect_firsts3(self, sequence):
-        result = []
-        epsilon_in_symbol_firsts = True
+    def sequence_firsts(self, development):
+        # (bitset, ordered ids) of the firsts of every suffix of development,
+        # longest first; a suffix has EPSILON only when all its symbols are
+        # nullable
+        suffixes = [(1, [EPSILON_ID])]
         
-        for symbol in sequence:
-            epsilon_in_symbol_firsts = False
+        for symbol in reversed(development):
+            bits, order = suffixes[-1]
             
-            if symbol in self.terminals:
-                self.add_unique(symbol, result)
-                break
-            
-            for first in self.firsts[symbol]:
-                epsilon_in_symbol_firsts |= first == EPSILON
-                self.add_unique(first, result)
+            if symbol == EPSILON_ID:
+                suffixes.append((bits, order))
+                continue
             
-            epsilon_in_symbol_firsts |= not self.firsts[symbol]
+            if self.is_terminal[symbol]:
+                suffixes.append((1 << symbol, [symbol]))
+                continue
             
-            if not epsilon_in_symbol_firsts:
-                break
+            symbol_bits = self.first_bits[symbol]
+            symbol_order = self.first_order[symbol]
+            if symbol_bits & 1:
+                symbol_bits &= ~1
+                suffixes.append((symbol_bits | bits, [first for first in symbol_order if first != EPSILON_ID]
+                                 + [first for first in order if not symbol_bits >> first & 1]))
+            else:
+                suffixes.append((symbol_bits, symbol_order))
         
-        if epsilon_in_symbol_firsts:
-            self.add_unique(EPSILON, result)
-        
-        return result
+        return suffixes[::-1]
 
     def collect_follows(self):
-        not_done = True
+        size = len(self.symbol_names)
+        self.follow_bits = [0] * size
+        self.follow_order = [[] for _ in range(size)]
+        users = [[] for _ in range(size)]
+        for idx, (nonterminal, _) in enumerate(self.productions):
+            users[nonterminal].append(idx)
+        
+        self.fixpoint(self.collect_rule_follows, users)
+        
+        names = self.symbol_names
+        self.follows = defaultdict(list)
+        for nonterminal in self.nonterminals:
+            symbol = self.symbol_ids[nonterminal]
+            self.follows[nonterminal] = [names[follow] for follow in self.follow_order[symbol]]
+
+    def collect_rule_follows(self, idx):
+        nonterminal, development = self.productions[idx]
+        bits = self.follow_bits
+        order = self.follow_order
+        changed = []
         
-        while not_done:
-            not_done = False
+        if idx == 0 and self.merge(bits, order, nonterminal, 1 << END_ID, (END_ID,)):
+            changed.append(nonterminal)
+        
+        for j, symbol in enumerate(development):
+            if not self.is_nonterminal[symbol]:
+                continue
             
-            for i, rule in enumerate(self.rules):
-                nonterminal, development = map(str.strip, rule.split('->'))
-                development = self.trim_elements(development.split())
-                
-                if i == 0:
-                    not_done |= self.add_unique('$', self.follows[nonterminal])
-                
-                for j, symbol in enumerate(development):
-                    if symbol in self.nonterminals:
-                        after_symbol_firsts = self.collect_firsts3(development[j + 1:])
-                        
-                        for first in after_symbol_firsts:
-                            if first == EPSILON:
-                                for follow in self.follows[nonterminal]:
-                                    not_done |= self.add_unique(follow, self.follows[symbol])
-                            else:
-                                not_done |= self.add_unique(first, self.follows[symbol])
+            after_bits, after_symbol_firsts = self.suffix_firsts[idx][j + 1]
+            if not after_bits & 1:
+                grew = self.merge(bits, order, symbol, after_bits, after_symbol_firsts)
+            elif not (after_bits & ~1 | bits[nonterminal]) & ~bits[symbol]:
+                grew = False
+            else:
+                grew = False
+                for first in after_symbol_firsts:
+                    if first == EPSILON_ID:
+                        grew |= self.merge(bits, order, symbol, bits[nonterminal], order[nonterminal])
+                    else:
+                        grew |= self.merge(bits, order, symbol, 1 << first, (first,))
+            
+            if grew:
+                changed.append(symbol)
+        
+        return changed
 
     def collect_alphabet_and_nonterminals_and_terminals(self):
+        # Tokenizes the rules once: productions[i] is the nonterminal and the
+        # development of rule i + 1 as symbol ids (EPSILON and '$' first)
+        self.symbol_ids = {EPSILON: EPSILON_ID, '$': END_ID}
+        self.symbol_names = [EPSILON, '$']
+        self.productions = []
+        alphabet = {}
+        nonterminals = {}
+        
         for rule in self.rules:
             nonterminal, development = map(str.strip, rule.split('->'))
             development = self.trim_elements(development.split())
             
-            self.add_unique(nonterminal, self.alphabet)
-            self.add_unique(nonterminal, self.nonterminals)
+            alphabet.setdefault(nonterminal)
+            nonterminals.setdefault(nonterminal)
             
             for symbol in development:
                 if symbol != EPSILON:
-                    self.add_unique(symbol, self.alphabet)
+                    alphabet.setdefault(symbol)
+            
+            self.productions.append((self.intern(nonterminal), [self.intern(symbol) for symbol in development]))
+        
+        self.alphabet = list(alphabet)
+        self.nonterminals = list(nonterminals)
+        self.terminals = [symbol for symbol in self.alphabet if symbol not in nonterminals]
         
-        terminals_set = set(self.nonterminals)
-        self.terminals = [symbol for symbol in self.alphabet if symbol not in terminals_set]
+        self.is_terminal = bytearray(len(self.symbol_names))
+        self.is_nonterminal = bytearray(len(self.symbol_names))
+        for symbol in self.terminals:
+            self.is_terminal[self.symbol_ids[symbol]] = 1
+        for symbol in self.nonterminals:
+            self.is_nonterminal[self.symbol_ids[symbol]] = 1
+
+    def intern(self, symbol):
+        symbol_id = self.symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self.symbol_ids[symbol] = len(self.symbol_names)
+            self.symbol_names.append(symbol)
+        return symbol_id
 
     def trim_elements(self, array):
         return [x.strip() for x in array]
@@ -185,7 +299,7 @@ class GrammarParser:
             return True
         return False
 
-    def print_formatted_output(self):
+    def formatted_output(self):
         sorted_nonterminals = sorted(self.nonterminals)
         sorted_terminals = sorted(self.terminals) + ['$']
         
@@ -202,8 +316,125 @@ class GrammarParser:
         
         initial_nonterminal = self.rules[0].split('->')[0].strip()
         
-        formatted_output = f"{nt_set};{initial_nonterminal};{term_set};" + ''.join(rule_mappings)
-        print(formatted_output)
+        return f"{nt_set};{initial_nonterminal};{term_set};" + ''.join(rule_mappings)
+
+    def print_formatted_output(self):
+        print(self.formatted_output())
+
+class PredictiveParser:
+    # Table-driven LL(1) parser for the grammar of a GrammarParser. Rule i
+    # (numbered from 0 here) expands by bodies[i], its development as symbol
+    # ids in reverse, ready to be pushed on the stack; table[row * width +
+    # terminal] is the rule for that nonterminal and terminal, -1 for none,
+    # with one row and one column per symbol id.
+    def __init__(self, grammar):
+        if grammar.conflicts:
+            nonterminal, terminal = grammar.conflicts[0]
+            raise ValueError(f"Grammar is not LL(1): two rules for {nonterminal!r} on {terminal!r}")
+        self.names = grammar.symbol_names
+        self.width = len(self.names)
+        self.start = grammar.productions[0][0] if grammar.productions else END_ID
+        self.bodies = [tuple(symbol for symbol in reversed(development) if symbol != EPSILON_ID)
+                       for _, development in grammar.productions]
+        self.terminal_ids = {symbol: grammar.symbol_ids[symbol] for symbol in grammar.terminals}
+        
+        self.table = array('i', [-1]) * (self.width * self.width)
+        for nonterminal, row in grammar.rule_table.items():
+            for terminal, rule_number in row.items():
+                if rule_number:
+                    cell = grammar.symbol_ids[nonterminal] * self.width + grammar.symbol_ids[terminal]
+                    self.table[cell] = int(rule_number) - 1
+
+    def symbol_of(self, token, key, position):
+        symbol = self.terminal_ids.get(token if key is None else key(token))
+        if symbol is None:
+            raise ValueError(f"Unknown terminal {token!r} at token {position}")
+        return symbol
+
+    def error(self, expected, symbol, position):
+        found = 'end of input' if symbol == END_ID else repr(self.names[symbol])
+        raise ValueError(f"Unexpected {found} at token {position}, expected {self.names[expected]!r}")
+
+    def derive(self, tokens, key=None):
+        # Yields the numbers of the rules of the leftmost derivation of
+        # tokens, as the input is read. tokens is any iterable of terminal
+        # names, or of tokens whose terminal name is key(token) (such as
+        # attrgetter('type') for lexer tokens).
+        table = self.table
+        width = self.width
+        bodies = self.bodies
+        stack = [END_ID, self.start]
+        pop = stack.pop
+        extend = stack.extend
+        position = -1
+        
+        for position, token in enumerate(tokens):
+            symbol = self.symbol_of(token, key, position)
+            top = pop()
+            while top != symbol:
+                rule = table[top * width + symbol]
+                if rule < 0:
+                    self.error(top, symbol, position)
+                yield rule + 1
+                extend(bodies[rule])
+                top = pop()
+        
+        position += 1
+        top = pop()
+        while top != END_ID:
+            rule = table[top * width + END_ID]
+            if rule < 0:
+                self.error(top, END_ID, position)
+            yield rule + 1
+            extend(bodies[rule])
+            top = pop()
+
+    def parse(self, tokens, key=None, pause_gc=False):
+        # ParseTree of tokens (see derive), its leaves being the tokens. A
+        # tree holds no reference cycles, so pause_gc may pause the cyclic
+        # garbage collector while a large one is built instead of rescanning
+        # it as it grows; this affects the whole process, so it is opt-in.
+        if not pause_gc:
+            return self.build_tree(tokens, key)
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self.build_tree(tokens, key)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def build_tree(self, tokens, key):
+        # parents runs parallel to stack, holding the children list each
+        # symbol's node or token goes into
+        table = self.table
+        width = self.width
+        bodies = self.bodies
+        names = self.names
+        root = []
+        stack = [END_ID, self.start]
+        parents = [None, root]
+        position = -1
+        
+        for position, token in enumerate(chain(tokens, (None,))):
+            symbol = END_ID if token is None else self.symbol_of(token, key, position)
+            top = stack.pop()
+            siblings = parents.pop()
+            while top != symbol:
+                rule = table[top * width + symbol]
+                if rule < 0:
+                    self.error(top, symbol, position)
+                children = []
+                siblings.append(ParseTree(names[top], rule + 1, children))
+                body = bodies[rule]
+                stack.extend(body)
+                parents.extend(repeat(children, len(body)))
+                top = stack.pop()
+                siblings = parents.pop()
+            if siblings is not None:
+                siblings.append(token)
+        
+        return root[0]
 
 def parse_grammar(input_text):
     rules = [rule.strip() for rule in input_text.split(';') if rule.strip()]
@@ -224,6 +455,17 @@ def parse_grammar(input_text):
     
     return "\n".join(grammar_text)
 
+def ll1_table(input_text):
+    # GrammarParser holding FIRST, FOLLOW and the LL(1) table of a grammar
+    # in the judge format (S = aB; B = b; ...)
+    parser = GrammarParser()
+    parser.grammar_changed(parse_grammar(input_text))
+    return parser
+
+def ll1_parser(input_text):
+    # PredictiveParser for a grammar in the judge format
+    return PredictiveParser(ll1_table(input_text))
+
 def print_parsed_grammar(parsed_grammar):
     print("Gramática de entrada:")
     for i, rule in enumerate(parsed_grammar.split('\n'), 1):
@@ -1,146 +1,353 @@
-from typing import List, Set, Dict, Tuple
-
-State = str
-
-def parse(input_str: str):
-    parts = input_str.split(';')
-    num_states = int(parts[0])
-    initial_state_name = parts[1]
-    final_states = set(parts[2].strip('{}').split(','))
-    alphabet = set(parts[3].strip('{}').split(','))
-    states = set()
-
-    for transition in parts[4:]:
-        src_name, symbol, dst_name = map(str.strip, transition.split(','))
-        if src_name not in states:
-            states.add(src_name)
-        if dst_name not in states:
-            states.add(dst_name)
-
-    initial_state = initial_state_name
-    transitions = [transition.split(',') for transition in parts[4:]]
-    automaton = AFD(states, initial_state, final_states, alphabet, transitions)
-    return automaton
-class AFD:
-    states: Set[State]
-    initial_state: State
-    final_states: Set[str]
-    alphabet: Set[str]
-    transitions: List[str]
-    transition_map: Dict[Tuple[State, str], Set[State]]
-    reverse_transition_map: Dict[Tuple[State, str], Set[State]]
-    num_states: int
-
-    def __init__(self, states: Set[State], initial_state: State, final_states: Set[str], alphabet: Set[str], transitions: List[str]) -> 'AFD':
-        self.initial_state = initial_state
-        self.final_states = {*final_states}
-        self.alphabet = {*alphabet}
-        self.states = {*states}
-        self.transitions = [*transitions]
-        self.num_states = len(states)
-        self.transition_map = self.get_transition_map()
-        self.reverse_transition_map = self.get_reverse_transition_map()
-
-    def get_transition_map(self):
-        return {(source, symbol): {dest} for source, symbol, dest in self.transitions}
-
-    def get_reverse_transition_map(self):
-        map = {}
-        for source, symbol, dest in self.transitions:
-            dests = map.setdefault((dest, symbol), set())
-            dests.add(source)
-        return map
-
-    def get_reachable_states(self, transition_map, state, symbols):
-        reachable_states = {state}
-        not_visited_states = {state}
-        while not_visited_states:
-            selected = not_visited_states.pop()
-            for symbol in symbols:
-                for neighbour in transition_map.get((selected,symbol), set()):
-                    if neighbour not in reachable_states:
-                        not_visited_states.add(neighbour)              
-                    reachable_states.add(neighbour)
-        return reachable_states
-        
+from array import array
+from copy import copy
+from itertools import accumulate, compress, repeat
+from operator import add, and_, floordiv, mod, mul
+
+from automaton_core import Automaton, build_csr
+
+HOPCROFT = 'hopcroft'
+VALMARI = 'valmari'
+
+def parse(input_str: str) -> 'AFD':
+    return AFD.read(input_str)
+
+class RefinablePartition:
+    # Partition of 0..size-1 into sets that are contiguous ranges
+    # [first[s], past[s]) of elements, with location giving each element's
+    # index. mark moves an element to the front of its set; split then
+    # separates the marked and unmarked part of every touched set, the
+    # smaller one becoming a new set. Initially the elements are grouped by
+    # keys, one set per distinct key in key order (a single set without
+    # keys).
+    __slots__ = ('elements', 'location', 'set_of', 'first', 'past', 'marked', 'touched')
+
+    def __init__(self, size, keys=None):
+        if keys is None:
+            self.elements = array('i', range(size))
+            self.first = array('i', [0] if size else [])
+            self.past = array('i', [size] if size else [])
+            self.set_of = array('i', [0]) * size
+        else:
+            self.elements = array('i', sorted(range(size), key=keys.__getitem__))
+            self.first = array('i')
+            self.past = array('i')
+            self.set_of = array('i', [0]) * size
+            previous = None
+            for i, element in enumerate(self.elements):
+                if keys[element] != previous or not i:
+                    previous = keys[element]
+                    if i:
+                        self.past.append(i)
+                    self.first.append(i)
+                self.set_of[element] = len(self.first) - 1
+            if size:
+                self.past.append(size)
+        self.location = array('i', [0]) * size
+        for i, element in enumerate(self.elements):
+            self.location[element] = i
+        self.marked = array('i', [0]) * len(self.first)
+        self.touched = []
+
+    @property
+    def count(self):
+        return len(self.first)
+
+    def mark(self, element):
+        set_ = self.set_of[element]
+        position = self.location[element]
+        boundary = self.first[set_] + self.marked[set_]
+        if position < boundary:
+            return
+        elements = self.elements
+        other = elements[boundary]
+        elements[position] = other
+        self.location[other] = position
+        elements[boundary] = element
+        self.location[element] = boundary
+        if not self.marked[set_]:
+            self.touched.append(set_)
+        self.marked[set_] += 1
+
+    def split(self):
+        first = self.first
+        past = self.past
+        marked = self.marked
+        while self.touched:
+            set_ = self.touched.pop()
+            boundary = first[set_] + marked[set_]
+            if boundary == past[set_]:
+                marked[set_] = 0
+                continue
+            if marked[set_] <= past[set_] - boundary:
+                first.append(first[set_])
+                past.append(boundary)
+                first[set_] = boundary
+            else:
+                first.append(boundary)
+                past.append(past[set_])
+                past[set_] = boundary
+            new_set = len(first) - 1
+            for i in range(first[new_set], past[new_set]):
+                self.set_of[self.elements[i]] = new_set
+            marked[set_] = 0
+            marked.append(0)
+
+    def sets(self):
+        return [frozenset(self.elements[self.first[s]:self.past[s]]) for s in range(len(self.first))]
+
+class AFD(Automaton):
+    __slots__ = ()
+
+    def get_reachable_states(self, offsets, targets, roots):
+        # bytearray marking the states reachable from roots in the graph
+        # whose successors of state s are targets[offsets[s]:offsets[s + 1]]
+        reached = bytearray(len(self.states))
+        stack = list(roots)
+        for state in stack:
+            reached[state] = 1
+        while stack:
+            state = stack.pop()
+            for i in range(offsets[state], offsets[state + 1]):
+                neighbour = targets[i]
+                if not reached[neighbour]:
+                    reached[neighbour] = 1
+                    stack.append(neighbour)
+        return reached
+
+    def forward_reachable(self):
+        return self.get_reachable_states(self.state_offsets(), self.targets, [self.initial])
+
+    def backward_reachable(self):
+        # One multi-source search from all final states over the
+        # predecessors of each state
+        offsets, sources = build_csr(len(self.states), self.targets, self.tails)
+        finals = [state for state in range(len(self.states)) if self.final[state]]
+        return self.get_reachable_states(offsets, sources, finals)
+
     def get_unreachable_states(self):
-        reachable_states = self.get_reachable_states(self.transition_map, self.initial_state, self.alphabet)
-        return self.states - reachable_states
-    
+        reached = self.forward_reachable()
+        return {state for state in range(len(self.states)) if not reached[state]}
+
     def get_dead_states(self):
-        reached = set()
-        for final_state in self.final_states:
-            states = self.get_reachable_states(self.reverse_transition_map, final_state, self.alphabet)
-            reached.update(states)
-        return self.states - reached
-    
-    def compute_equivalence_classes(self):
-        p = {frozenset(self.final_states), frozenset(self.states - self.final_states)}
-        q = {frozenset(self.final_states)}
+        reached = self.backward_reachable()
+        return {state for state in range(len(self.states)) if not reached[state]}
 
-        while q:
-            sel = q.pop()
+    def trim(self):
+        # Removes, in place, the states that are unreachable or from which
+        # no final state is reachable (except the initial state, so that
+        # there is always one), and the transitions touching them. Returns
+        # the number of states removed. The searches follow per-state
+        # adjacency and transitions are filtered with C level iterators, so
+        # trimming is linear in the number of states and transitions,
+        # whatever the number of symbols.
+        keep = bytearray(map(and_, self.forward_reachable(), self.backward_reachable()))
+        keep[self.initial] = 1
+        pruned = len(keep) - sum(keep)
+        if not pruned:
+            return 0
 
-            for symbol in self.alphabet:
-                x = set()
+        new_id = array('i', accumulate(keep, initial=0))
+        kept = bytes(map(and_, map(keep.__getitem__, self.tails), map(keep.__getitem__, self.targets)))
+        sources = array('i', map(new_id.__getitem__, compress(self.tails, kept)))
+        labels = array('i', compress(self.labels, kept))
+        destinations = array('i', map(new_id.__getitem__, compress(self.targets, kept)))
 
-                for state in sel:
-                    x.update(self.reverse_transition_map.get((state, symbol), set()))
+        Automaton.__init__(self, list(compress(self.states, keep)), self.symbols, new_id[self.initial],
+                           bytearray(compress(self.final, keep)), sources, labels, destinations, self.alphabet,
+                           self.declared_states)
+        return pruned
 
-                x = frozenset(x)
+    def transition_function(self):
+        # Target of every (state, symbol) cell, completed with a sink state
+        # (id len(states), looping on every symbol) when some are missing;
+        # returns the table and the number of states including the sink.
+        num_states = len(self.states)
+        width = len(self.symbols)
+        offsets = self.offsets
+        targets = self.targets
+        if len(targets) == num_states * width:
+            return array('i', targets), num_states
+        delta = array('i', [num_states]) * ((num_states + 1) * width)
+        for cell in range(num_states * width):
+            if offsets[cell] != offsets[cell + 1]:
+                delta[cell] = targets[offsets[cell]]
+        return delta, num_states + 1
 
-                for y in [*p]:
-                    if not(x & y) or not y - x:
-                        continue
+    def compute_equivalence_classes(self):
+        # Hopcroft's partition refinement, O(m log n). The blocks are
+        # contiguous ranges [first[b], end[b]) of elements, with location
+        # giving each state's index in elements. A splitter marks the
+        # predecessors of its states by swapping them to the front of their
+        # block; a block with some but not all states marked is split, the
+        # smaller half becoming the new block. The sink added to complete
+        # the automaton is dropped from the result; in a trimmed DFA it only
+        # shares a block with states that have no final state at all.
+        num_states = len(self.states)
+        width = len(self.symbols)
+        delta, total = self.transition_function()
+        cells = range(total * width)
+        keys = array('i', map(add, map(mul, delta, repeat(width)), map(mod, cells, repeat(width))))
+        sources = array('i', map(floordiv, cells, repeat(width)))
+        inverse_offsets, inverse = build_csr(total * width, keys, sources)
+
+        final = [state for state in range(num_states) if self.final[state]]
+        others = [state for state in range(total) if state >= num_states or not self.final[state]]
+        elements = array('i', final + others)
+        location = array('i', [0]) * total
+        for i, state in enumerate(elements):
+            location[state] = i
+        block_of = array('i', [0]) * total
+        first = array('i', [0])
+        end = array('i', [len(final)])
+        if final and others:
+            for state in others:
+                block_of[state] = 1
+            first.append(len(final))
+            end.append(total)
+        elif not final:
+            end[0] = total
+        marked = array('i', [0]) * len(first)
 
-                    p.remove(y)
-                    p.add(x & y)
-                    p.add(y - x)
+        worklist = [0 if len(first) == 1 or len(final) <= len(others) else 1]
+        touched = []
+        while worklist:
+            splitter = worklist.pop()
+            members = elements[first[splitter]:end[splitter]]
+            for symbol in range(width):
+                for state in members:
+                    cell = state * width + symbol
+                    for i in range(inverse_offsets[cell], inverse_offsets[cell + 1]):
+                        predecessor = inverse[i]
+                        block = block_of[predecessor]
+                        position = location[predecessor]
+                        boundary = first[block] + marked[block]
+                        if position >= boundary:
+                            other = elements[boundary]
+                            elements[boundary] = predecessor
+                            elements[position] = other
+                            location[predecessor] = boundary
+                            location[other] = position
+                            if not marked[block]:
+                                touched.append(block)
+                            marked[block] += 1
 
-                    if y in q:
-                        q.remove(y)
-                        q.add(x & y)
-                        q.add(y - x)
+                for block in touched:
+                    count = marked[block]
+                    marked[block] = 0
+                    size = end[block] - first[block]
+                    if count == size:
                         continue
-                
-                    if len(x & y) <= len(y - x):
-                        q.add(x & y)
+                    new_block = len(first)
+                    if count <= size - count:
+                        first.append(first[block])
+                        end.append(first[block] + count)
+                        first[block] += count
                     else:
-                        q.add(y - x)
-        return p
-    
-    def minimize(self):
-        states = self.states - self.get_unreachable_states() - self.get_dead_states()
-        final_states = self.final_states & states
-        transitions = [t for t in self.transitions if t[0] in states and t[2] in states]
-        new_afd = AFD(states, self.initial_state, final_states, self.alphabet, transitions)
-
-        equivalence_classes = new_afd.compute_equivalence_classes()
-        merged_states = [sorted(clss)[0] for clss in equivalence_classes]
+                        first.append(first[block] + count)
+                        end.append(end[block])
+                        end[block] = first[block] + count
+                    marked.append(0)
+                    for i in range(first[new_block], end[new_block]):
+                        block_of[elements[i]] = new_block
+                    # The new block is always the smaller half, which is
+                    # enough to queue. If the old block is still queued, its
+                    # id now stands for the other half, so both halves are.
+                    worklist.append(new_block)
+                touched.clear()
+
+        blocks = [frozenset(elements[first[block]:end[block]]) for block in range(len(first))]
+        return [block - {num_states} for block in blocks if block != {num_states}]
+
+    def compute_equivalence_classes_partial(self):
+        # Valmari and Lehtinen's O(m log n) refinement for partial DFAs,
+        # with m the number of transitions actually present. Along with the
+        # blocks of states it refines the transitions into cords: the
+        # transitions with the same label into the same block. Every new
+        # cord splits blocks by the tails of its transitions and every new
+        # block splits cords by the transitions into it. Missing
+        # transitions need no sink and the transitions are read from the
+        # edge arrays, never through the per-cell index, so memory and time
+        # follow the real transitions and not states * symbols. States from
+        # which no final state is reachable should be removed first, as
+        # minimize does.
+        num_states = len(self.states)
+        tails = self.tails
+        labels = self.labels
+        heads = self.targets
+        incoming_offsets, incoming = build_csr(num_states, heads, array('i', range(len(heads))))
+
+        blocks = RefinablePartition(num_states, [not final for final in self.final])
+        cords = RefinablePartition(len(heads), labels)
+
+        # The first block never has to split cords: the initial cords (one
+        # per label) and the other blocks already account for it
+        block = 1
+        cord = 0
+        while cord < cords.count:
+            for i in range(cords.first[cord], cords.past[cord]):
+                blocks.mark(tails[cords.elements[i]])
+            blocks.split()
+            cord += 1
+            while block < blocks.count:
+                for i in range(blocks.first[block], blocks.past[block]):
+                    state = blocks.elements[i]
+                    for j in range(incoming_offsets[state], incoming_offsets[state + 1]):
+                        cords.mark(incoming[j])
+                cords.split()
+                block += 1
+        return blocks.sets()
+
+    def restrict(self, states, merge=None):
+        # Automaton over the given states (old ids, in the new id order), or
+        # over their classes when merge maps old ids to new ones; transitions
+        # leaving the kept states are dropped. Only the edge arrays are read,
+        # so this is linear in the number of states and transitions.
+        if merge is None:
+            merge = dict(zip(states, range(len(states))))
+        new_id = array('i', [-1]) * len(self.states)
+        final = bytearray(len(states))
+        for state, new_state in merge.items():
+            new_id[state] = new_state
+            if self.final[state]:
+                final[new_state] = 1
+        transitions = {transition for transition in zip(map(new_id.__getitem__, self.tails), self.labels,
+                                                        map(new_id.__getitem__, self.targets))
+                       if transition[0] >= 0 and transition[2] >= 0}
+        names = [self.states[state] for state in states]
+        sources, labels, destinations = (array('i', column) for column in zip(*transitions)) if transitions \
+            else (array('i'), array('i'), array('i'))
+        return AFD(names, self.symbols, merge[self.initial], final, sources, labels, destinations, self.alphabet)
+
+    def minimize(self, method=HOPCROFT):
+        # method is HOPCROFT (completes the automaton with a sink) or VALMARI
+        # (works on the partial automaton, better for sparse ones). The
+        # initial state is kept even when useless, so that a minimized
+        # automaton always has one.
+        if method not in (HOPCROFT, VALMARI):
+            raise ValueError(f"Unknown minimization method: {method}")
+        trimmed = copy(self)
+        trimmed.trim()
+
+        if method == VALMARI:
+            equivalence_classes = trimmed.compute_equivalence_classes_partial()
+        else:
+            equivalence_classes = [clss for clss in trimmed.compute_equivalence_classes() if clss]
+        merged_states = [min(clss, key=trimmed.states.__getitem__) for clss in equivalence_classes]
         merged_states_map = {
-            state: merged_states[i]
+            state: i
             for i, clss in enumerate(equivalence_classes)
             for state in clss
         }
+        return trimmed.restrict(merged_states, merged_states_map)
 
-        new_transitions = {
-            (merged_states_map[source], symbol, merged_states_map[dest]) 
-            for source, symbol, dest in transitions
-        }
-        new_initial_state = merged_states_map[self.initial_state]
-        new_final_states = {merged_states_map[state] for state in final_states}
-        new_afd = AFD(merged_states, new_initial_state, new_final_states, 
-            self.alphabet, new_transitions)
-        return new_afd
-
-    def format(self):
-        final_states = f"{{{','.join(sorted(self.final_states))}}}"
-        alphabet = f"{{{','.join(sorted(self.alphabet))}}}"
-        trans = sorted(self.transitions, key=lambda x: x[1])
-        trans = sorted(trans, key=lambda x: x[0])
-        transitions = ';'.join(','.join(transition) for transition in trans)        
-        return f"{self.num_states};{self.initial_state};{final_states};{alphabet};{transitions}"
-
-afd = ((parse(input())))
-minimized_adf = (afd.minimize()).format()
-print(minimized_adf)
\ No newline at end of file
+def minimize(afd: AFD, method: str = HOPCROFT) -> AFD:
+    return afd.minimize(method)
+
+def solve(input_str: str) -> str:
+    return parse(input_str).minimize().format()
+
+def main():
+    print(solve(input()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+from array import array
+from collections import deque
+
+from dfa_equivalence import DfaView, is_final, joint_alphabet, step, view
+from minimizar import AFD, HOPCROFT
+
+# Accepting state of a complement, standing for the dead state of the
+# complemented DFA
+SINK = object()
+
+
+def product(first, second, accept):
+    # DfaView of the product of two DFAs (anything view() takes) whose
+    # states are the pairs (p, q) of their states, None standing for a dead
+    # one. Pairs are only built when stepped into, so a search that stops
+    # early never sees most of |first| x |second|. accept(final_p, final_q)
+    # says which pairs are final; pairs that can no longer accept whatever
+    # the other side does are dead.
+    first, second = view(first), view(second)
+    dead_first = not accept(False, False) and not accept(False, True)
+    dead_second = not accept(False, False) and not accept(True, False)
+
+    def product_step(pair, symbol):
+        p, q = step(first, pair[0], symbol), step(second, pair[1], symbol)
+        if p is None and (q is None or dead_first) or q is None and dead_second:
+            return None
+        return p, q
+
+    return DfaView((first.initial, second.initial), first.symbols | second.symbols, product_step,
+                   lambda pair: accept(is_final(first, pair[0]), is_final(second, pair[1])),
+                   first.open_alphabet or second.open_alphabet)
+
+
+def intersection(first, second):
+    return product(first, second, lambda p, q: p and q)
+
+
+def union(first, second):
+    return product(first, second, lambda p, q: p or q)
+
+
+def minus(first, second):
+    # The words of first that are not in second (dfa_equivalence.difference
+    # is the distinguishing word of two DFAs)
+    return product(first, second, lambda p, q: p and not q)
+
+
+def complement(dfa, alphabet=None):
+    # The words over alphabet (by default the DFA's own symbols, or every
+    # symbol when it has an open alphabet) that the DFA rejects. The missing
+    # transitions go to SINK, which accepts and loops on every symbol.
+    dfa = view(dfa)
+    symbols = dfa.symbols if alphabet is None else set(alphabet)
+    open_alphabet = dfa.open_alphabet and alphabet is None
+
+    def complement_step(state, symbol):
+        if not open_alphabet and symbol not in symbols:
+            return None
+        if state is SINK:
+            return SINK
+        state = dfa.step(state, symbol)
+        return SINK if state is None else state
+
+    return DfaView(dfa.initial, symbols, complement_step, lambda state: state is SINK or not dfa.is_final(state),
+                   open_alphabet)
+
+
+def witness(dfa):
+    # A shortest word the DFA accepts (as a list of symbols), or None when
+    # its language is empty. The search stops at the first final state. A
+    # symbol the DFA does not mention stands for all such symbols.
+    dfa = view(dfa)
+    alphabet = joint_alphabet(dfa, dfa)
+    parent = {dfa.initial: None}
+    queue = deque([dfa.initial])
+    while queue:
+        state = queue.popleft()
+        if dfa.is_final(state):
+            word = []
+            while parent[state] is not None:
+                state, symbol = parent[state]
+                word.append(symbol)
+            return word[::-1]
+        for symbol in alphabet:
+            successor = dfa.step(state, symbol)
+            if successor is not None and successor not in parent:
+                parent[successor] = (state, symbol)
+                queue.append(successor)
+    return None
+
+
+def is_empty(dfa):
+    return witness(dfa) is None
+
+
+def universality_counterexample(dfa, alphabet=None):
+    # A shortest word over alphabet (see complement) the DFA rejects, or
+    # None when it accepts all of them
+    return witness(complement(dfa, alphabet))
+
+
+def is_universal(dfa, alphabet=None):
+    return universality_counterexample(dfa, alphabet) is None
+
+
+def materialize(dfa, minimal=False, alphabet=None, method=HOPCROFT):
+    # minimizar.AFD of the reachable part of a DFA (usually a product),
+    # with states q0, q1, ... in breadth-first order and transitions over
+    # alphabet (by default the symbols the DFA mentions; words using other
+    # symbols are left out). minimal also minimizes it with method.
+    dfa = view(dfa)
+    alphabet = sorted(dfa.symbols) if alphabet is None else list(alphabet)
+    ids = {dfa.initial: 0}
+    states = [dfa.initial]
+    sources = array('i')
+    labels = array('i')
+    destinations = array('i')
+    for source, state in enumerate(states):
+        for label, symbol in enumerate(alphabet):
+            successor = dfa.step(state, symbol)
+            if successor is None:
+                continue
+            if successor not in ids:
+                ids[successor] = len(states)
+                states.append(successor)
+            sources.append(source)
+            labels.append(label)
+            destinations.append(ids[successor])
+
+    final = bytearray(bool(dfa.is_final(state)) for state in states)
+    afd = AFD([f'q{i}' for i in range(len(states))], alphabet, 0, final, sources, labels, destinations)
+    return afd.minimize(method) if minimal else afd
@@ -1,3 +1,93 @@
+import io
+import sys
+from collections import deque
+
+
+class PositionSet:
+    # Offset bitset: position offset + i is in the set when bit i of bits is
+    # set, with bit 0 always set, so a set costs memory proportional to the
+    # span of its positions rather than to its largest position.
+    __slots__ = ('offset', 'bits')
+
+    def __init__(self, offset=0, bits=0):
+        self.offset = offset
+        self.bits = bits
+
+    @classmethod
+    def single(cls, position):
+        return cls(position, 1)
+
+    def __or__(self, other):
+        if not other.bits:
+            return self
+        if not self.bits:
+            return other
+        if self.offset <= other.offset:
+            return PositionSet(self.offset, self.bits | other.bits << (other.offset - self.offset))
+        return PositionSet(other.offset, other.bits | self.bits << (self.offset - other.offset))
+
+    def __and__(self, other):
+        offset = max(self.offset, other.offset)
+        bits = (self.bits >> (offset - self.offset)) & (other.bits >> (offset - other.offset))
+        if not bits:
+            return EMPTY
+        shift = (bits & -bits).bit_length() - 1
+        return PositionSet(offset + shift, bits >> shift)
+
+    def __contains__(self, position):
+        return position >= self.offset and self.bits >> (position - self.offset) & 1 == 1
+
+    def __iter__(self):
+        bits = bin(self.bits)[:1:-1]
+        i = bits.find('1')
+        while i != -1:
+            yield self.offset + i
+            i = bits.find('1', i + 1)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def __eq__(self, other):
+        return self.offset == other.offset and self.bits == other.bits
+
+    def __hash__(self):
+        return hash((self.offset, self.bits))
+
+
+EMPTY = PositionSet()
+
+
+def state_name(positions):
+    return "{" + ",".join(map(str, positions)) + "}"
+
+
+END_MARKER = '#'
+OPERATORS = '()*+?|.&'
+ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v'}
+CLASS_ESCAPES = {
+    'd': '0123456789',
+    'w': '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz',
+    's': ' \t\n\r\f\v',
+}
+
+
+class CharSet:
+    # Label of a leaf: a set of symbols, or every symbol outside it when
+    # negated. text is how the label was written in the regex.
+    __slots__ = ('chars', 'negated', 'text')
+
+    def __init__(self, chars, negated=False, text=None):
+        self.chars = frozenset(chars)
+        self.negated = negated
+        self.text = text if text is not None else ''.join(sorted(self.chars))
+
+    def __contains__(self, char):
+        return (char in self.chars) != self.negated
+
+
 class Node:
     def __init__(self, parent):
         self.parent = parent
@@ -5,6 +95,9 @@ class Node:
         self.lastpos = None
         self.nullable = None
 
+    def children(self):
+        return ()
+
 class ConcatNode(Node):
     def __init__(self, parent):
         super(ConcatNode, self).__init__(parent)
@@ -14,9 +107,6 @@ class ConcatNode(Node):
     def create_subtree(self, nodestack):
         operand2 = nodestack.pop()
         operand1 = nodestack.pop()
-        self.lchild = operand1 if isinstance(operand1, Node) else LeafNode(parent=self, string=operand1)
-        self.rchild = operand2 if isinstance(operand2, Node) else LeafNode(parent=self, string=operand2)
-
 
         if isinstance(operand1, Node):
             self.lchild = operand1
@@ -33,29 +123,24 @@ class ConcatNode(Node):
     def __str__(self):
         return '[' + str(self.lchild) + '.' + str(self.rchild) + ']'
 
-    def isnullable(self):
-        a = self.lchild.isnullable()
-        b = self.rchild.isnullable()
-        self.nullable = a and b
-        return self.nullable
+    def children(self):
+        return self.lchild, self.rchild
+
+    def annotate(self, followpos):
+        self.nullable = self.lchild.nullable and self.rchild.nullable
 
-    def findfirstpos(self):
-        a = self.lchild.findfirstpos()
-        b = self.rchild.findfirstpos()
         if self.lchild.nullable:
-            self.firstpos = list(set(a + b))
+            self.firstpos = self.lchild.firstpos | self.rchild.firstpos
         else:
-            self.firstpos = a
-        return self.firstpos
+            self.firstpos = self.lchild.firstpos
 
-    def findlastpos(self):
-        a = self.lchild.findlastpos()
-        b = self.rchild.findlastpos()
         if self.rchild.nullable:
-            self.lastpos = list(set(a + b))
+            self.lastpos = self.lchild.lastpos | self.rchild.lastpos
         else:
-            self.lastpos = b
-        return self.lastpos
+            self.lastpos = self.rchild.lastpos
+
+        for i in self.lchild.lastpos:
+            followpos[i - 1] = followpos[i - 1] | self.rchild.firstpos
 
 
 class StarNode(Node):
@@ -73,18 +158,16 @@ class StarNode(Node):
     def __str__(self):
         return '[ (' + str(self.child) + ') * ]'
 
-    def isnullable(self):
-        self.child.isnullable()
-        self.nullable = True
-        return True
+    def children(self):
+        return self.child,
 
-    def findfirstpos(self):
-        self.firstpos = self.child.findfirstpos()
-        return self.firstpos
+    def annotate(self, followpos):
+        self.nullable = True
+        self.firstpos = self.child.firstpos
+        self.lastpos = self.child.lastpos
 
-    def findlastpos(self):
-        self.lastpos = self.child.findlastpos()
-        return self.lastpos
+        for i in self.lastpos:
+            followpos[i - 1] = followpos[i - 1] | self.firstpos
 
 
 class OrNode(Node):
@@ -112,28 +195,68 @@ class OrNode(Node):
     def __str__(self):
         return '[' + str(self.lchild) + '|' + str(self.rchild) + ']'
 
-    def isnullable(self):
-        a = self.lchild.isnullable()
-        b = self.rchild.isnullable()
-        self.nullable = a or b
-        return self.nullable
+    def children(self):
+        return self.lchild, self.rchild
+
+    def annotate(self, followpos):
+        self.nullable = self.lchild.nullable or self.rchild.nullable
+        self.firstpos = self.lchild.firstpos | self.rchild.firstpos
+        self.lastpos = self.lchild.lastpos | self.rchild.lastpos
+
+
+class PlusNode(Node):
+    def __init__(self, parent):
+        super(PlusNode, self).__init__(parent)
+        self.child = None
+
+    def create_subtree(self, nodestack):
+        self.child = nodestack.pop()
+        self.child.parent = self
+
+    def __str__(self):
+        return '[ (' + str(self.child) + ') + ]'
+
+    def children(self):
+        return self.child,
+
+    def annotate(self, followpos):
+        self.nullable = self.child.nullable
+        self.firstpos = self.child.firstpos
+        self.lastpos = self.child.lastpos
+
+        for i in self.lastpos:
+            followpos[i - 1] = followpos[i - 1] | self.firstpos
+
 
-    def findfirstpos(self):
-        self.firstpos = list(set(self.lchild.findfirstpos() + self.rchild.findfirstpos()))
-        return self.firstpos
+class OptionalNode(Node):
+    def __init__(self, parent):
+        super(OptionalNode, self).__init__(parent)
+        self.child = None
+
+    def create_subtree(self, nodestack):
+        self.child = nodestack.pop()
+        self.child.parent = self
 
-    def findlastpos(self):
-        self.lastpos = list(set(self.lchild.findlastpos() + self.rchild.findlastpos()))
-        return self.lastpos
+    def __str__(self):
+        return '[ (' + str(self.child) + ') ? ]'
+
+    def children(self):
+        return self.child,
+
+    def annotate(self, followpos):
+        self.nullable = True
+        self.firstpos = self.child.firstpos
+        self.lastpos = self.child.lastpos
 
 
 class LeafNode(Node):
     num_of_instances = 0
 
-    def __init__(self, parent, string):
+    def __init__(self, parent, string, charset=None):
         super(LeafNode, self).__init__(parent)
 
         self.string = string
+        self.charset = charset
 
         LeafNode.num_of_instances += 1
         self.number = LeafNode.num_of_instances
@@ -141,65 +264,109 @@ class LeafNode(Node):
     def __str__(self):
         return '[' + self.string + ']'
 
-    def isnullable(self):
-        if self.string == '&':
-            self.nullable = True
-            return True
-        else:
-            self.nullable = False
-            return False
-
-    def findfirstpos(self):
-        if self.string == '&':
-            self.firstpos = []
-            return self.firstpos
-        else:
-            self.firstpos = [self.number, ]
-            return self.firstpos
-
-    def findlastpos(self):
-        if self.string == '&':
-            self.lastpos = []
-            return self.lastpos
-        else:
-            self.lastpos = [self.number, ]
-            return self.lastpos
+    def annotate(self, followpos):
+        self.nullable = False
+        self.firstpos = PositionSet.single(self.number)
+        self.lastpos = self.firstpos
 
 
 class SyntaxTree:
     def __init__(self, string):
         LeafNode.num_of_instances = 0
-        self.regex = self.add_concat(string) + '.#'
+        self.regex = self.add_end_marker(string)
         self.root = self.convert_regex_to_syntaxtree()
+        self.balance_alternatives()
+
+        self.followpos = [EMPTY] * LeafNode.num_of_instances
+        self.leaves = []
+        self.annotate()
+        self.end_markers = [leaf.number for leaf in self.leaves if leaf.charset is None]
+        self.compress_alphabet()
+
+    def add_end_marker(self, string):
+        return ['('] + self.add_concat(string) + [')', '.', END_MARKER]
+
+    def tokenize(self, string):
+        # Splits the regex into CharSet operands, '&' and operator characters.
+        # '.' is the explicit concatenation operator, as in a.b.
+        tokens = []
+        i = 0
+        while i < len(string):
+            char = string[i]
+            if char == '\\':
+                charset, i = self.read_escape(string, i + 1)
+                tokens.append(charset)
+            elif char == '[':
+                charset, i = self.read_class(string, i + 1)
+                tokens.append(charset)
+            elif char in OPERATORS:
+                tokens.append(char)
+                i += 1
+            else:
+                tokens.append(CharSet(char))
+                i += 1
+        return tokens
+
+    def read_escape(self, string, i):
+        if i >= len(string):
+            raise ValueError('Dangling escape at the end of the regex')
+        char = string[i]
+        if char.lower() in CLASS_ESCAPES:
+            return CharSet(CLASS_ESCAPES[char.lower()], char.isupper(), '\\' + char), i + 1
+        return CharSet(ESCAPES.get(char, char), text='\\' + char), i + 1
+
+    def read_class_symbol(self, string, i):
+        if i >= len(string):
+            raise ValueError('Unterminated character class')
+        if string[i] != '\\':
+            return string[i], i + 1
+        charset, i = self.read_escape(string, i + 1)
+        if charset.negated:
+            raise ValueError('Negated escape inside a character class')
+        if len(charset.chars) == 1:
+            return next(iter(charset.chars)), i
+        return charset.chars, i
+
+    def read_class(self, string, i):
+        # Reads [abc], [a-z0-9] or [^...] starting just after the '['. A ']'
+        # right after the opening bracket is taken literally.
+        start = i - 1
+        negated = string[i:i + 1] == '^'
+        if negated:
+            i += 1
+
+        chars = set()
+        first = True
+        while i >= len(string) or string[i] != ']' or first:
+            first = False
+            low, i = self.read_class_symbol(string, i)
+            if isinstance(low, str) and string[i:i + 1] == '-' and string[i + 1:i + 2] not in ('', ']'):
+                high, i = self.read_class_symbol(string, i + 1)
+                if not isinstance(high, str) or high < low:
+                    raise ValueError(f'Invalid range in character class at {string[start:i]}')
+                chars.update(map(chr, range(ord(low), ord(high) + 1)))
+            else:
+                chars.update(low)
 
-        self.root.isnullable()
-        self.root.findfirstpos()
-        self.root.findlastpos()
-
-        self.followpos = []
-        for i in range(0, LeafNode.num_of_instances):
-            self.followpos.append(None)
+        return CharSet(chars, negated, string[start:i + 1]), i + 1
 
     def add_concat(self, string):
-        opstack = []
-        nodestack = []
+        result = []
 
-        result = ''
-
-        for i in range(0, len(string) - 1):
-            result = result + string[i]
-            if (string[i].isalpha() and string[i + 1].isalpha()) or \
-                    (string[i].isalpha() and string[i + 1] == '(') or \
-                    (string[i] == ')' and string[i + 1].isalpha()) or \
-                    (string[i] == '*' and string[i + 1].isalpha()) or \
-                    (string[i] == '*' and string[i + 1] == '(') or \
-                    (string[i] == ')' and string[i + 1] == '('):
-                result += '.'
-        result = result + string[-1]
+        for token in self.tokenize(string):
+            if result and self.ends_operand(result[-1]) and self.starts_operand(token):
+                result.append('.')
+            result.append(token)
         return result
 
+    def ends_operand(self, token):
+        return isinstance(token, CharSet) or token in ('&', ')', '*', '+', '?')
+
+    def starts_operand(self, token):
+        return isinstance(token, CharSet) or token in ('&', '(')
+
     def not_greater(self, i, j):
-        prioriy = {'*': 3, '.': 2, '|': 1}
+        prioriy = {'*': 3, '+': 3, '?': 3, '.': 2, '|': 1}
         try:
             a = prioriy[i]
             b = prioriy[j]
@@ -212,7 +379,9 @@ class SyntaxTree:
         opstack = []
 
         for r in self.regex:
-            if r.isalpha() or r == '#':
+            if isinstance(r, CharSet):
+                nodestack.append(LeafNode(parent=None, string=r.text, charset=r))
+            elif r == END_MARKER:
                 nodestack.append(LeafNode(parent=None, string=r))
             elif r == '&':
                 nodestack.append(EpsilonNode(parent=None))
@@ -238,6 +407,10 @@ class SyntaxTree:
 
         if op == '*':
             op = StarNode(parent=None)
+        elif op == '+':
+            op = PlusNode(parent=None)
+        elif op == '?':
+            op = OptionalNode(parent=None)
         elif op == '.':
             op = ConcatNode(parent=None)
         elif op == '|':
@@ -248,26 +421,111 @@ class SyntaxTree:
         op.create_subtree(nodestack)
         nodestack.append(op)
 
-    def findfollowpos(self, node):
-        if isinstance(node, ConcatNode):
-            for i in node.lchild.lastpos:
-                if self.followpos[i - 1]:
-                    self.followpos[i - 1] = list(set(self.followpos[i - 1] + node.rchild.firstpos))
+    def balance_alternatives(self):
+        # A chain of n '|' parses as a left-deep tree whose unions cost
+        # O(n^2); rebuilding it balanced keeps the leaves in order and makes
+        # the unions O(n log n).
+        stack = [(self.root, None, None)]
+        while stack:
+            node, parent, slot = stack.pop()
+            if isinstance(node, OrNode):
+                alternatives = []
+                chain = [node]
+                while chain:
+                    alternative = chain.pop()
+                    if isinstance(alternative, OrNode):
+                        chain.append(alternative.rchild)
+                        chain.append(alternative.lchild)
+                    else:
+                        alternatives.append(alternative)
+
+                stack.extend((alternative, None, None) for alternative in alternatives)
+
+                while len(alternatives) > 1:
+                    paired = []
+                    for i in range(0, len(alternatives) - 1, 2):
+                        op = OrNode(parent=None)
+                        op.create_subtree([alternatives[i], alternatives[i + 1]])
+                        paired.append(op)
+                    if len(alternatives) % 2:
+                        paired.append(alternatives[-1])
+                    alternatives = paired
+
+                alternatives[0].parent = parent
+                if parent is None:
+                    self.root = alternatives[0]
                 else:
-                    self.followpos[i - 1] = node.rchild.firstpos
-
-            self.findfollowpos(node.lchild)
-            self.findfollowpos(node.rchild)
-
-        elif isinstance(node, StarNode):
-            for i in node.lastpos:
-                if self.followpos[i - 1]:
-                    self.followpos[i - 1] = list(set(self.followpos[i - 1] + node.firstpos))
-                else:
-                    self.followpos[i - 1] = node.firstpos
-            self.findfollowpos(node.child)
-
-        return
+                    setattr(parent, slot, alternatives[0])
+            else:
+                for slot_name in ('lchild', 'rchild', 'child'):
+                    child = getattr(node, slot_name, None)
+                    if child is not None:
+                        stack.append((child, node, slot_name))
+
+    def annotate(self):
+        # Post-order walk with an explicit stack: computes nullable, firstpos,
+        # lastpos and followpos and collects the leaves in position order.
+        stack = [(self.root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                node.annotate(self.followpos)
+                if isinstance(node, LeafNode):
+                    self.leaves.append(node)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.children()))
+
+    def compress_alphabet(self):
+        # Partitions the symbols into classes that no leaf tells apart, so the
+        # DFA has one column per class instead of one per symbol. Each leaf
+        # label refines the partition; class 0 holds every symbol that no
+        # label mentions and is listed in classes as the empty set.
+        class_of = {}
+        members = [None]
+        refined = set()
+        for leaf in self.leaves:
+            if leaf.charset is None or leaf.charset.chars in refined:
+                continue
+            refined.add(leaf.charset.chars)
+
+            split = {}
+            for char in leaf.charset.chars:
+                split.setdefault(class_of.get(char, 0), []).append(char)
+            for old_class, chars in split.items():
+                if old_class != 0 and len(chars) == len(members[old_class]):
+                    continue
+                if old_class != 0:
+                    members[old_class].difference_update(chars)
+                for char in chars:
+                    class_of[char] = len(members)
+                members.append(set(chars))
+
+        ordered = sorted(members[1:], key=min)
+        self.classes = [frozenset()] + [frozenset(chars) for chars in ordered]
+        self.class_of = {char: i for i, chars in enumerate(self.classes) for char in chars}
+
+        label_classes = {}
+        self.classes_of = [()] * LeafNode.num_of_instances
+        for leaf in self.leaves:
+            if leaf.charset is None:
+                continue
+            key = (leaf.charset.chars, leaf.charset.negated)
+            if key not in label_classes:
+                matched = {self.class_of[char] for char in leaf.charset.chars}
+                if leaf.charset.negated:
+                    matched = set(range(len(self.classes))) - matched
+                label_classes[key] = tuple(sorted(matched))
+            self.classes_of[leaf.number - 1] = label_classes[key]
+
+    def move(self, positions):
+        # Splits a set of positions by symbol class in a single pass, mapping
+        # each class that occurs in it to the union of its positions' followpos.
+        moves = {}
+        for i in positions:
+            for symbol_class in self.classes_of[i - 1]:
+                moves[symbol_class] = moves.get(symbol_class, EMPTY) | self.followpos[i - 1]
+        return moves
 
 
 class State:
@@ -277,9 +535,10 @@ class State:
         self.Dtran = {}
 
     def __str__(self):
+        # Dtran is keyed by symbol class ids (see SyntaxTree.classes)
         s = '<' + self.name + ' ,' + str(self.statenumber) + ' ,'
         for transition in self.Dtran:
-            s = s + 'Dtran(' + transition + ')=' + self.Dtran[transition].name
+            s = s + 'Dtran(' + str(transition) + ')=' + self.Dtran[transition].name
             s = s + '\t'
         s = s + '>\n'
         return s
@@ -291,123 +550,88 @@ class ConvertToDfa:
         self.followpos = tree.followpos
         self.initial_statenumber = tree.root.firstpos
         self.initial_state = None
-        self.leaf_nodes = {}
-        self.final_number = next((leaf.number for leaf in self.get_leaf_nodes(tree.root) if leaf.string == '#'), None)
+        self.final_number = tree.end_markers[-1]
         self.final_states = set()
         self.discovered_order = []
 
     def get_final_number(self):
         return self.final_number
 
-    def get_leaf_nodes(self, node):
-        if node is None:
-            return []
-        elif isinstance(node, LeafNode) or isinstance(node, EpsilonNode):
-            return [node] if isinstance(node, LeafNode) else []
-        else:
-            lchild_nodes = self.get_leaf_nodes(node.lchild) if hasattr(node, 'lchild') else []
-            rchild_nodes = self.get_leaf_nodes(node.rchild) if hasattr(node, 'rchild') else []
-            return lchild_nodes + rchild_nodes
-
-    def find_leaf_nodes(self, node):
-        if isinstance(node, LeafNode) and node.string not in ('#', '&'):
-            try:
-                self.leaf_nodes[node.string].append(node.number)
-            except KeyError:
-                self.leaf_nodes[node.string] = [node.number]
-        elif isinstance(node, StarNode):
-            self.find_leaf_nodes(node.child)
-        elif isinstance(node, ConcatNode) or isinstance(node, OrNode):
-            self.find_leaf_nodes(node.lchild)
-            self.find_leaf_nodes(node.rchild)
-
-
-
     def convert(self):
-        def state_name(statenumber):
-            return "{" + ",".join(map(str, sorted(statenumber))) + "}"
-
-        self.find_leaf_nodes(self.tree.root)
-        initial_statename = state_name(self.initial_statenumber)
-        self.initial_state = State(name=initial_statename, statenumber=self.initial_statenumber)
-        states = {initial_statename: self.initial_state}
+        self.initial_state = State(name=state_name(self.initial_statenumber), statenumber=self.initial_statenumber)
+        states = {self.initial_statenumber: self.initial_state}
         final_states = set()
-        queue = [self.initial_state]
+        queue = deque([self.initial_state])
         self.discovered_order.append(self.initial_state)
 
         while queue:
-            current_state = queue.pop(0)
+            current_state = queue.popleft()
             if self.final_number in current_state.statenumber:
                 final_states.add(current_state.name)
 
-            for symbol in self.leaf_nodes:
-                next_statenumber = frozenset(
-                    pos for elem in current_state.statenumber if elem in self.leaf_nodes[symbol]
-                    for pos in self.followpos[elem - 1]
-                )
-                next_statename = state_name(next_statenumber)
-                if next_statename not in states:
-                    next_state = State(name=next_statename, statenumber=next_statenumber)
-                    states[next_statename] = next_state
+            for symbol, next_statenumber in self.tree.move(current_state.statenumber).items():
+                if next_statenumber not in states:
+                    next_state = State(name=state_name(next_statenumber), statenumber=next_statenumber)
+                    states[next_statenumber] = next_state
                     queue.append(next_state)
                     self.discovered_order.append(next_state)
-                current_state.Dtran[symbol] = states[next_statename]
+                current_state.Dtran[symbol] = states[next_statenumber]
 
         return self.initial_state
 
 
 
 class DFAToFormattedOutput:
-    def __init__(self, dfa, fn):
+    def __init__(self, dfa, fn, classes, states=None):
+        # classes lists the symbols of each class the DFA moves on; class 0
+        # (symbols no leaf mentions) has none and so is not printed. states
+        # are the DFA's states (e.g. ConvertToDfa.discovered_order), found by
+        # a breadth-first walk from dfa when not given.
         self.dfa = dfa
-        self.all_states = []
-        self.final_states = set()
-        self.alphabet = set()
-        self.transitions = []
         self.fn = fn
-        self.collect_dfa_info()
+        self.classes = classes
+        self.states = states if states is not None else self.collect_states()
 
-    def collect_dfa_info(self):
-        queue = [self.dfa]
-        visited = set()
+    def collect_states(self):
+        states = [self.dfa]
+        visited = {self.dfa}
+        queue = deque(states)
 
         while queue:
-            state = queue.pop(0)
-            if state not in visited:
-                visited.add(state)
-                if state.name != '{}':
-                    self.all_states.append(state)
-                if self.fn in state.statenumber:
-                    if state not in self.final_states:
-                        self.final_states.add(state)
-
-                for symbol, target in state.Dtran.items():
-                    self.alphabet.add(symbol)
-                    self.transitions.append((state.name, symbol, target.name))
+            state = queue.popleft()
+            for target in state.Dtran.values():
+                if target not in visited:
+                    visited.add(target)
+                    states.append(target)
                     queue.append(target)
+        return states
+
+    def write(self, stream):
+        # Class 0 stands for every symbol the regex does not name, which a
+        # finite alphabet cannot list; rather than dropping those moves and
+        # writing a DFA of another language, such DFAs are refused.
+        if any(target.name != '{}' for state in self.states for symbol_class, target in state.Dtran.items()
+               if symbol_class == 0):
+            raise ValueError("The DFA moves on symbols the regex does not name, which the text format cannot list")
+
+        states = sorted((state for state in self.states if state.name != '{}'), key=lambda state: state.name)
+        final_state_names = ",".join(state.name for state in states if self.fn in state.statenumber)
+        used_classes = {symbol_class for state in self.states for symbol_class in state.Dtran}
+        alphabet_str = ",".join(sorted(symbol for symbol_class in used_classes for symbol in self.classes[symbol_class]))
+
+        stream.write(f"{len(states)};{{{self.dfa.name}}};{{{final_state_names}}};{{{alphabet_str}}};")
+        for state in states:
+            transitions = sorted(
+                (symbol, target.name)
+                for symbol_class, target in state.Dtran.items() if target.name != '{}'
+                for symbol in self.classes[symbol_class]
+            )
+            stream.write("".join(f"{state.name},{symbol},{dest};" for symbol, dest in transitions))
 
     def generate_formatted_output(self):
-        total_states = len(self.all_states)
-        initial_state = self.dfa.name
-        final_state_names = ",".join(sorted([state.name for state in self.final_states]))
-        alphabet_str = ",".join(sorted(self.alphabet))
-        transitions_dict = {}
-        for src, symbol, dest in self.transitions:
-            if dest != "{}":
-                if src not in transitions_dict:
-                    transitions_dict[src] = {}
-                transitions_dict[src][symbol] = dest
-
-        transitions_str = ""
-        for src in sorted(transitions_dict.keys()):
-            for symbol in sorted(self.alphabet):
-                if symbol in transitions_dict[src]:
-                    dest = transitions_dict[src][symbol]
-                    transitions_str += f"{src},{symbol},{dest};"
-
-        formatted_output = f"{total_states};{{{initial_state}}};{{{final_state_names}}};{{{alphabet_str}}};{transitions_str}"
-
-        return formatted_output
+        output = io.StringIO()
+        self.write(output)
+        return output.getvalue()
 
 
 class EpsilonNode(Node):
@@ -415,22 +639,33 @@ class EpsilonNode(Node):
         super(EpsilonNode, self).__init__(parent)
         self.nullable = True
 
-    def isnullable(self):
-        return True
+    def annotate(self, followpos):
+        self.firstpos = EMPTY
+        self.lastpos = EMPTY
+
+
+def regex_to_dfa(regex):
+    # Converter holding the DFA of regex: its tree, initial state and states
+    # in discovery order
+    converttree = ConvertToDfa(tree=SyntaxTree(regex))
+    converttree.convert()
+    return converttree
+
+
+def formatter(regex):
+    converttree = regex_to_dfa(regex)
+    return DFAToFormattedOutput(converttree.initial_state, converttree.get_final_number(), converttree.tree.classes,
+                                converttree.discovered_order)
+
+
+def solve(regex):
+    return formatter(regex).generate_formatted_output()
 
-    def findfirstpos(self):
-        self.firstpos = []
-        return self.firstpos
 
-    def findlastpos(self):
-        self.lastpos = []
-        return self.lastpos
+def main():
+    formatter(input()).write(sys.stdout)
+    sys.stdout.write('\n')
 
+if __name__ == "__main__":
+    main()
 
-tree = SyntaxTree(input())
-tree.findfollowpos(tree.root)
-converttree = ConvertToDfa(tree=tree)
-dfa = converttree.convert()
-formatted_output_converter = DFAToFormattedOutput(dfa, converttree.get_final_number())
-formatted_output = formatted_output_converter.generate_formatted_output()
-print(formatted_output)
@@ -0,0 +1,25 @@
+import unittest
+
+from automaton_core import Automaton
+
+
+class ReadTest(unittest.TestCase):
+    def test_round_trip(self):
+        text = '3;A;{C};{a,b};A,a,B;A,b,A;B,a,C;C,b,C'
+        self.assertEqual(Automaton.read(text).format(), text)
+        self.assertEqual(Automaton.read('1;A;{};{a}').format(), '1;A;{};{a};')
+
+    def test_braced_state_names(self):
+        automaton = Automaton.read('2;{A};{{AB}};{a};{A},a,{AB};{AB},a,{AB};')
+        self.assertEqual(automaton.states, ['{A}', '{AB}'])
+        self.assertEqual(list(automaton.final), [0, 1])
+
+    def test_malformed_transitions(self):
+        # Field counts that add up to a multiple of three are still rejected
+        for text in ['3;A;{B};{a};A,a,B,C;D,E', '2;A;{B};{a};A,a', '2;A;{B};{a};A,a,B;A,a,B,B']:
+            with self.assertRaises(ValueError):
+                Automaton.read(text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import random
+import unittest
+
+import determinizar
+import minimizar
+from dfa_equivalence import equivalent
+
+
+def random_nfa(rng, names):
+    finals = rng.sample(names, rng.randint(1, len(names)))
+    transitions = [f'{source},{symbol},{target}'
+                   for source in names for symbol in 'ab&' for target in names if rng.random() < 0.25]
+    return ';'.join([str(len(names)), names[0], '{' + ','.join(finals) + '}', '{a,b}'] + transitions)
+
+
+class PipeToMinimizarTest(unittest.TestCase):
+    # determinizar's output is valid minimizar input, and minimizing it
+    # keeps the language of the NFA
+    def test_multi_character_names(self):
+        text = determinizar.solve('3;q0;{q2};{a,b};q0,a,q0;q0,a,q1;q0,b,q0;q1,b,q2')
+        self.assertEqual(text, '3;{q0};{{q0|q2}};{a,b};{q0},a,{q0|q1};{q0},b,{q0};{q0|q1},a,{q0|q1};'
+                               '{q0|q1},b,{q0|q2};{q0|q2},a,{q0|q1};{q0|q2},b,{q0};')
+        afd = minimizar.parse(text)
+        self.assertEqual(afd.num_states, 3)
+        self.assertEqual(sorted(afd.states[state] for state in range(3) if afd.final[state]), ['{q0|q2}'])
+        self.assertEqual(minimizar.parse(minimizar.solve(text)).num_states, 3)
+
+    def test_random_nfas(self):
+        rng = random.Random(0)
+        for names in (['A', 'B', 'C', 'D'], ['q0', 'q1', 'q2', 'q3'], ['A', 'B1', 'B', '1B']):
+            for _ in range(50):
+                nfa = random_nfa(rng, names)
+                minimized = minimizar.parse(minimizar.solve(determinizar.solve(nfa)))
+                self.assertTrue(equivalent(minimized, determinizar.parse(nfa)), nfa)
+
+
+if __name__ == '__main__':
+    unittest.main()
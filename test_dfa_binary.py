@@ -0,0 +1,70 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+from itertools import product
+from unittest import mock
+
+from automaton_core import Automaton
+from dfa_binary import DENSE, ROWS, BinaryDfa, dumps, from_text, to_text
+
+COMPLETE = '3;A;{C};{a,b};A,a,B;A,b,A;B,a,C;B,b,A;C,a,C;C,b,C'
+SPARSE = '4;A;{D};{a,b,c,d,e,f,g,h};A,a,B;B,h,C;C,c,D;D,a,A'
+
+
+def text_accepts(automaton, word):
+    state = automaton.initial
+    for symbol in word:
+        symbol = automaton.symbol_id(symbol)
+        successors = automaton.successors(state, symbol) if symbol >= 0 else ()
+        if not successors:
+            return False
+        state = successors[0]
+    return bool(automaton.final[state])
+
+
+class BinaryDfaTest(unittest.TestCase):
+    def check(self, text, layout, alphabet):
+        data = from_text(text)
+        dfa = BinaryDfa(data)
+        self.assertEqual(dfa.layout, layout)
+        self.assertEqual(to_text(data), text)
+        automaton = Automaton.read(text)
+        for length in range(5):
+            for word in product(alphabet, repeat=length):
+                self.assertEqual(dfa.accepts(word), text_accepts(automaton, word), word)
+
+    def test_dense(self):
+        self.check(COMPLETE, DENSE, 'abx')
+
+    def test_rows(self):
+        self.check(SPARSE, ROWS, 'achx')
+
+    def test_big_endian_host(self):
+        # On a big-endian host both sides byteswap; faking one here runs
+        # the same code with the swapped data
+        with mock.patch.object(sys, 'byteorder', 'big'):
+            self.check(COMPLETE, DENSE, 'abx')
+            self.check(SPARSE, ROWS, 'achx')
+
+    def test_open(self):
+        rng = random.Random(0)
+        names = [f'q{i}' for i in range(20)]
+        transitions = [f'{source},{symbol},{rng.choice(names)}' for source in names for symbol in 'ab'
+                       if rng.random() < 0.7]
+        text = ';'.join(['20', 'q0', '{q3,q7}', '{a,b}'] + transitions)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dfa.bin')
+            with open(path, 'wb') as file:
+                file.write(dumps(Automaton.read(text)))
+            dfa = BinaryDfa.open(path)
+            self.assertEqual(dfa.to_automaton().format(), Automaton.read(text).format())
+
+    def test_rejects_nondeterministic(self):
+        with self.assertRaises(ValueError):
+            from_text('2;A;{B};{a};A,a,A;A,a,B')
+
+
+if __name__ == '__main__':
+    unittest.main()
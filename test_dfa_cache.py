@@ -0,0 +1,67 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from dfa_cache import DfaCache, SUFFIX, dump, load
+from dfa_matcher import compile
+
+
+class DfaCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = DfaCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def entries(self):
+        return sorted(name for name in os.listdir(self.directory.name) if name.endswith(SUFFIX))
+
+    def test_hits_and_misses(self):
+        self.assertTrue(self.cache.get('a*b').fullmatch('aab'))
+        dfa = self.cache.get('a*b')
+        self.assertTrue(dfa.fullmatch('aab'))
+        self.assertFalse(dfa.fullmatch('aba'))
+        self.cache.get('b*a')
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 2, 'evictions': 0})
+        self.assertEqual(len(self.entries()), 2)
+
+        # A new cache over the same directory starts warm
+        cache = DfaCache(self.directory.name)
+        self.assertTrue(cache.get('b*a').fullmatch('bba'))
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 0, 'evictions': 0})
+
+    def test_normalized_regexes_share_an_entry(self):
+        self.cache.get('ab')
+        self.assertTrue(self.cache.get('a.b').fullmatch('ab'))
+        self.cache.get('[a-c]')
+        self.assertTrue(self.cache.get('[cba]').fullmatch('b'))
+        self.assertEqual(self.cache.stats()['hits'], 2)
+        self.assertEqual(len(self.entries()), 2)
+
+    def test_corrupt_entries_are_rebuilt(self):
+        data = dump(compile('(a|b)*abb'))
+        path = self.cache.path(self.cache.key('(a|b)*abb'))
+        for corrupt in (data[:-4], data[:-40], data[:10], data + b'\0', b'', b'x' * len(data)):
+            with open(path, 'wb') as file:
+                file.write(corrupt)
+            with self.assertRaises((ValueError, struct.error)):
+                load(corrupt)
+            self.assertTrue(self.cache.get('(a|b)*abb').fullmatch('babb'))
+            with open(path, 'rb') as file:
+                self.assertEqual(file.read(), data)
+        self.assertEqual(self.cache.stats()['misses'], 6)
+
+    def test_eviction(self):
+        size = len(dump(compile('a0')))
+        cache = DfaCache(self.directory.name, max_bytes=3 * size)
+        for digit in '0123456789':
+            cache.get('a' + digit)
+        self.assertLessEqual(len(self.entries()), 3)
+        self.assertEqual(cache.stats()['evictions'], 10 - len(self.entries()))
+        self.assertEqual(cache.size, len(self.entries()) * size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import random
+import unittest
+
+from dfa_matcher import compile
+
+
+class LargeRegexTest(unittest.TestCase):
+    # Regexes of about 100k symbols, far deeper than the recursion limit
+    def test_long_concatenation(self):
+        pattern = compile('ab' * 50000)
+        self.assertTrue(pattern.fullmatch('ab' * 50000))
+        self.assertFalse(pattern.fullmatch('ab' * 49999))
+        self.assertFalse(pattern.fullmatch('ab' * 49999 + 'ba'))
+
+    def test_keyword_alternation(self):
+        rng = random.Random(0)
+        keywords = sorted({''.join(rng.choice('abcdefghij') for _ in range(8)) for _ in range(11000)})
+        regex = '|'.join(keywords)
+        self.assertGreater(len(regex), 95000)
+
+        pattern = compile(regex)
+        for keyword in keywords[::50]:
+            self.assertTrue(pattern.fullmatch(keyword))
+        keyword_set = set(keywords)
+        for _ in range(200):
+            word = ''.join(rng.choice('abcdefghij') for _ in range(8))
+            self.assertEqual(pattern.fullmatch(word), word in keyword_set)
+        self.assertFalse(pattern.fullmatch(keywords[0] + keywords[1]))
+        self.assertFalse(pattern.fullmatch(''))
+
+
+def naive_search(pattern, text, pos=0):
+    # Leftmost-longest match by trying every start in turn
+    for start in range(pos, len(text) + 1):
+        end = pattern.match(text, start)
+        if end is not None:
+            return start, end
+    return None
+
+
+class SearchTest(unittest.TestCase):
+    def test_matches_naive_search(self):
+        rng = random.Random(1)
+        for regex in ['a*b', 'ab*c|b', 'a|a*b', '(ab)*', 'a?', 'b+a', '(a|b)*abb', '[ab]c*', '(a|bc)+c?']:
+            pattern = compile(regex)
+            for _ in range(200):
+                text = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 12)))
+                pos = rng.randint(0, len(text))
+                self.assertEqual(pattern.search(text, pos), naive_search(pattern, text, pos), (regex, text, pos))
+                self.assertEqual(pattern.search(text.encode(), pos), naive_search(pattern, text, pos))
+
+    def test_failed_attempts_are_not_rescanned(self):
+        # Every start begins an attempt that only fails at the end of the
+        # text; one pass over 10^6 symbols takes well under a second
+        pattern = compile('a*b')
+        self.assertIsNone(pattern.search('a' * 1000000))
+        self.assertEqual(pattern.search('a' * 1000000 + 'b'), (0, 1000001))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import io
+import random
+import unittest
+
+from dfa_matcher import compile
+from dfa_stream import StreamScanner, finditer
+
+
+def naive_finditer(pattern, data):
+    # Non-overlapping leftmost-longest matches by repeated searches
+    matches = []
+    pos = 0
+    while pos <= len(data):
+        match = pattern.search(data, pos)
+        if match is None:
+            break
+        matches.append(match)
+        start, end = match
+        pos = end if end > start else start + 1
+    return matches
+
+
+class FinditerTest(unittest.TestCase):
+    def test_matches_repeated_search(self):
+        rng = random.Random(0)
+        for regex in ['a*b', 'ab*c|b', 'a|a*b', '(ab)*', 'a?', 'b+a', '(a|b)*abb', 'c', '[ab]c*', '(a|bc)+c?']:
+            pattern = compile(regex)
+            for _ in range(150):
+                data = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 40))).encode()
+                chunk_size = rng.randint(1, 8)
+                self.assertEqual(list(finditer(pattern, io.BytesIO(data), chunk_size)),
+                                 naive_finditer(pattern, data), (regex, data, chunk_size))
+
+    def test_failed_attempts_keep_no_input(self):
+        # Every position starts an attempt that only fails at the end of the
+        # input: one pass, with nothing buffered between chunks
+        pattern = compile('a*b')
+        scanner = StreamScanner(pattern)
+        classes = bytes(pattern.bytes_classes)
+        chunk = (b'a' * 65536).translate(classes)
+        for _ in range(16):
+            self.assertEqual(scanner.feed(chunk), [])
+            self.assertEqual(len(scanner.pending), 0)
+        self.assertEqual(scanner.feed(b'b'.translate(classes), final=True), [(0, 16 * 65536 + 1)])
+
+    def test_no_match_in_long_input(self):
+        self.assertEqual(list(finditer(compile('a*b'), io.BytesIO(b'a' * 1000000))), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
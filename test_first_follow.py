@@ -0,0 +1,82 @@
+import random
+import unittest
+
+from first_follow import first_follow, parse_input, solve, symbols_of
+
+
+def naive_first_follow(productions):
+    # Iterates the textbook equations until nothing changes
+    nullable = set()
+    first = {left: set() for left in productions}
+
+    def sequence(symbols):
+        # FIRST of a sequence without '&', and whether it is nullable
+        result = set()
+        for symbol in symbols:
+            if not symbol.isupper():
+                return result | {symbol}, False
+            result |= first.get(symbol, set())
+            if symbol not in nullable:
+                return result, False
+        return result, True
+
+    changed = True
+    while changed:
+        changed = False
+        for left, rights in productions.items():
+            for right in rights:
+                symbols, is_nullable = sequence(symbols_of(right))
+                if not symbols <= first[left] or is_nullable and left not in nullable:
+                    first[left] |= symbols
+                    if is_nullable:
+                        nullable.add(left)
+                    changed = True
+
+    follow = {left: set() for left in productions}
+    follow[next(iter(productions))].add('$')
+    changed = True
+    while changed:
+        changed = False
+        for left, rights in productions.items():
+            for right in rights:
+                symbols = symbols_of(right)
+                for i, symbol in enumerate(symbols):
+                    if symbol not in follow:
+                        continue
+                    after, is_nullable = sequence(symbols[i + 1:])
+                    if is_nullable:
+                        after |= follow[left]
+                    if not after <= follow[symbol]:
+                        follow[symbol] |= after
+                        changed = True
+
+    return {left: first[left] | {'&'} if left in nullable else first[left] for left in productions}, follow
+
+
+class FirstFollowTest(unittest.TestCase):
+    def test_nullable_prefix(self):
+        # S = ABC with A and B nullable but not C: FIRST(S) has no '&' and
+        # FOLLOW(A) gets FIRST(C) through B
+        self.assertEqual(solve('S = ABC; A = aA; A = &; B = bB; B = &; C = cC; C = d'),
+                         'First(S) = {a, b, c, d}; First(A) = {&, a}; First(B) = {&, b}; First(C) = {c, d}; '
+                         'Follow(S) = {$}; Follow(A) = {b, c, d}; Follow(B) = {c, d}; Follow(C) = {$};')
+
+    def test_left_recursion(self):
+        self.assertEqual(solve('E = E+T; E = T; T = T*F; T = F; F = (E); F = i'),
+                         'First(E) = {(, i}; First(T) = {(, i}; First(F) = {(, i}; '
+                         'Follow(E) = {$, ), +}; Follow(T) = {$, ), *, +}; Follow(F) = {$, ), *, +};')
+        self.assertEqual(solve('S = AS; S = b; A = SA; A = a; A = &'),
+                         'First(S) = {a, b}; First(A) = {&, a, b}; Follow(S) = {$, a, b}; Follow(A) = {a, b};')
+
+    def test_matches_naive_fixpoint(self):
+        rng = random.Random(0)
+        for _ in range(1000):
+            rules = [f"{left} = {''.join(rng.choice('SABCDabc') for _ in range(rng.randint(0, 4))) or '&'}"
+                     for left in 'SABC'[:rng.randint(1, 4)] for _ in range(rng.randint(1, 3))]
+            rng.shuffle(rules)
+            productions = parse_input('; '.join(rules))
+            self.assertEqual(first_follow(productions), naive_first_follow(productions), rules)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import gc
+import random
+import unittest
+
+from first_follow import first_follow, parse_input
+from ll1 import ParseTree, ll1_parser, ll1_table
+
+EXPRESSIONS = 'E = TX; X = +TX; X = &; T = FY; Y = *FY; Y = &; F = (E); F = i'
+
+
+class TableTest(unittest.TestCase):
+    def test_nullable_prefix(self):
+        # FIRST(AB) has no '&' since B is not nullable, so S = AB does not
+        # claim [S,c] from S = c
+        grammar = 'X = SC; S = c; S = AB; A = &; A = a; B = b; C = c'
+        table = ll1_table(grammar)
+        self.assertEqual(sorted(table.firsts['S']), ['a', 'b', 'c'])
+        self.assertEqual(table.conflicts, [])
+        self.assertEqual(list(ll1_parser(grammar).derive('cc')), [1, 2, 7])
+        self.assertEqual(list(ll1_parser(grammar).derive('abc')), [1, 3, 5, 6, 7])
+
+    def test_conflict(self):
+        self.assertEqual(ll1_table('S = aA; S = aB; A = b; B = c').conflicts, [('S', 'a')])
+        with self.assertRaises(ValueError):
+            ll1_parser('S = aA; S = aB; A = b; B = c')
+
+    def test_agrees_with_first_follow(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            rules = [f"{left} = {''.join(rng.choice('SABCabc') for _ in range(rng.randint(0, 3))) or '&'}"
+                     for left in 'SABC' for _ in range(rng.randint(1, 3))]
+            rng.shuffle(rules)
+            grammar = '; '.join(rules)
+            table = ll1_table(grammar)
+            first, follow = first_follow(parse_input(grammar))
+            for nonterminal in first:
+                self.assertEqual(set(table.firsts[nonterminal]), first[nonterminal], grammar)
+                self.assertEqual(set(table.follows[nonterminal]), follow[nonterminal], grammar)
+
+
+class ParseTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = ll1_parser(EXPRESSIONS)
+
+    def test_derive(self):
+        self.assertEqual(list(self.parser.derive('i+i*i')), [1, 4, 8, 6, 2, 4, 8, 5, 8, 6, 3])
+        self.assertEqual(list(self.parser.derive('(i)')), [1, 4, 7, 1, 4, 8, 6, 3, 6, 3])
+
+    def test_parse(self):
+        self.assertEqual(self.parser.parse('i*i'), ParseTree('E', 1, [
+            ParseTree('T', 4, [ParseTree('F', 8, ['i']),
+                               ParseTree('Y', 5, ['*', ParseTree('F', 8, ['i']), ParseTree('Y', 6, [])])]),
+            ParseTree('X', 3, [])]))
+
+    def test_key(self):
+        tokens = [('name', 'x'), ('plus', '+'), ('name', 'y')]
+        tree = self.parser.parse(tokens, key=lambda token: {'name': 'i', 'plus': '+'}[token[0]])
+        self.assertEqual(tree.children[0].children[0].children, [('name', 'x')])
+        self.assertEqual(tree.children[1].children[0], ('plus', '+'))
+
+    def test_errors(self):
+        for tokens, message in [('i+', "Unexpected end of input at token 2, expected 'T'"),
+                                ('i)', "Unexpected ')' at token 1, expected '$'"),
+                                ('+i', "Unexpected '+' at token 0, expected 'E'"),
+                                ('', "Unexpected end of input at token 0, expected 'E'"),
+                                ('i+x', "Unknown terminal 'x' at token 2")]:
+            with self.assertRaises(ValueError) as derive_error:
+                list(self.parser.derive(tokens))
+            self.assertEqual(str(derive_error.exception), message)
+            with self.assertRaises(ValueError) as parse_error:
+                self.parser.parse(tokens)
+            self.assertEqual(str(parse_error.exception), message)
+
+    def test_gc_is_left_alone_by_default(self):
+        tokens = list('i+i*(i+i)')
+        self.assertTrue(gc.isenabled())
+        tree = self.parser.parse(tokens)
+        self.assertTrue(gc.isenabled())
+        self.assertEqual(self.parser.parse(tokens, pause_gc=True), tree)
+        self.assertTrue(gc.isenabled())
+
+    def test_pause_gc_restores_gc_on_error(self):
+        with self.assertRaises(ValueError):
+            self.parser.parse(list('i+'), pause_gc=True)
+        self.assertTrue(gc.isenabled())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import random
+import unittest
+from array import array
+
+import dfa_matcher
+import minimizar
+import product
+
+
+class EmptyAlphabetTest(unittest.TestCase):
+    # With no symbols there are no transitions at all, and only the initial
+    # state is reachable
+    def test_solve(self):
+        self.assertEqual(minimizar.solve('2;A;{A,B};{}'), '1;A;{A};{};')
+        self.assertEqual(minimizar.solve('2;A;{B};{}'), '1;A;{};{};')
+
+    def test_methods(self):
+        afd = minimizar.parse('3;A;{A};{}')
+        for method in (minimizar.HOPCROFT, minimizar.VALMARI):
+            self.assertEqual(afd.minimize(method).format(), '1;A;{A};{};')
+
+    def test_materialize_empty_word(self):
+        self.assertEqual(product.materialize(dfa_matcher.compile('&'), minimal=True).format(), '1;q0;{q0};{};')
+
+
+class TrimTest(unittest.TestCase):
+    def test_trim(self):
+        afd = minimizar.parse('5;A;{C};{a,b};A,a,B;A,b,D;B,a,C;C,b,C;D,a,D;E,a,C')
+        self.assertEqual(afd.trim(), 2)
+        self.assertEqual(afd.format(), '3;A;{C};{a,b};A,a,B;B,a,C;C,b,C')
+        self.assertEqual(afd.trim(), 0)
+
+    def test_large_alphabet(self):
+        # Trimming follows the transitions, not the states * symbols cells:
+        # here 10^4 states over 10^6 symbols
+        states = 10000
+        sources = array('i', range(states - 1))
+        labels = array('i', range(0, 100 * (states - 1), 100))
+        destinations = array('i', range(1, states))
+        final = bytearray(states)
+        final[states // 2] = 1
+        afd = minimizar.AFD([f'q{i}' for i in range(states)], [f's{i}' for i in range(1000000)], 0, final,
+                            sources, labels, destinations)
+        self.assertEqual(afd.trim(), states // 2 - 1)
+        self.assertEqual(afd.num_states, states // 2 + 1)
+        self.assertEqual(len(afd.targets), states // 2)
+
+
+class PartialMinimizationTest(unittest.TestCase):
+    def test_matches_hopcroft(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            names = [f'q{i}' for i in range(rng.randint(1, 6))]
+            transitions = [f'{source},{symbol},{rng.choice(names)}'
+                           for source in names for symbol in 'abc' if rng.random() < 0.6]
+            finals = [name for name in names if rng.random() < 0.4]
+            afd = minimizar.parse(';'.join([str(len(names)), 'q0', '{' + ','.join(finals) + '}', '{a,b,c}']
+                                           + transitions))
+            self.assertEqual(afd.minimize(minimizar.VALMARI).format(), afd.minimize(minimizar.HOPCROFT).format())
+
+    def test_large_alphabet(self):
+        # Two identical chains of 5000 transitions, with labels spread over
+        # 10^6 symbols, merge into one; the states * symbols cells are
+        # never visited
+        length = 5000
+        sources = array('i', [0, 0] + list(range(1, length)) + list(range(length + 1, 2 * length)))
+        labels = array('i', [0, 1] + list(range(200, 200 * length, 200)) * 2)
+        destinations = array('i', [1, length + 1] + list(range(2, length + 1))
+                             + list(range(length + 2, 2 * length + 1)))
+        final = bytearray(2 * length + 1)
+        final[length] = final[2 * length] = 1
+        afd = minimizar.AFD([f'q{i}' for i in range(2 * length + 1)], [f's{i}' for i in range(1000000)], 0,
+                            final, sources, labels, destinations)
+        minimal = afd.minimize(minimizar.VALMARI)
+        self.assertEqual(minimal.num_states, length + 1)
+        self.assertEqual(len(minimal.targets), length + 1)
+        self.assertEqual(sum(minimal.final), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+
+from regex_to_dfa import regex_to_dfa, solve
+
+
+class SolveTest(unittest.TestCase):
+    def test_classes(self):
+        self.assertEqual(solve('[a-b]+'), '2;{{1}};{{1,2}};{a,b};{1,2},a,{1,2};{1,2},b,{1,2};{1},a,{1,2};{1},b,{1,2};')
+
+    def test_unnamed_symbols_are_refused(self):
+        # [^a] moves on every symbol but a, which no finite alphabet lists
+        for regex in ['[^a]', 'a.[^b]', '\\D', '[^a]*|b']:
+            with self.assertRaises(ValueError):
+                solve(regex)
+
+    def test_state_str(self):
+        self.assertIn('Dtran(1)={2}', str(regex_to_dfa('a.[^b]').initial_state))
+
+
+if __name__ == '__main__':
+    unittest.main()